@@ -0,0 +1,110 @@
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from agent_layer import refine_website_inputs_batch_async
+from agent_logic import generate_website_package_async, normalize_payload
+from industries import lookup_industry
+from telemetry import request_id_var
+
+# ---------- CONFIG ----------
+# Inputs refined together in one model call
+REFINE_BATCH_SIZE = int(os.environ.get("REFINE_BATCH_SIZE", 10))
+
+# ---------- RATE LIMIT ----------
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second, bursting to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+# ---------- GROUPING ----------
+def industry_key(website_type: str) -> str:
+    """Website types resolving to the same industry (theme, FAQs, prompt hints) share a group."""
+    return lookup_industry(website_type).id
+
+def group_items(payloads: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    groups = {}
+    for i, payload in enumerate(payloads):
+        _, website_type, _ = normalize_payload(payload)
+        groups.setdefault(industry_key(website_type), []).append(i)
+    return groups
+
+# ---------- BATCH ----------
+async def _prerefine(payloads: List[Dict[str, Any]], indexes: List[int]):
+    # One refinement call per chunk of a group; results land in the model cache
+    items = []
+    for i in indexes:
+        if payloads[i].get("bypass_cache"):
+            continue
+        business_name, website_type, sections = normalize_payload(payloads[i])
+        items.append({"business_name": business_name, "website_type": website_type, "sections": sections})
+    for start in range(0, len(items), REFINE_BATCH_SIZE):
+        await refine_website_inputs_batch_async(items[start:start + REFINE_BATCH_SIZE])
+
+async def generate_batch(payloads: List[Dict[str, Any]], concurrency: int = 8, rate_per_second: Optional[float] = None):
+    """
+    Generates many sites, yielding {"event": "item", "index", "status", "result" | "error"}
+    as each finishes and a final {"event": "summary"}.
+    Items are grouped by industry: each group is refined in shared batch calls
+    and then generated back to back so theme/FAQ work is reused.
+    """
+    groups = group_items(payloads)
+    limiter = RateLimiter(rate_per_second, burst=concurrency) if rate_per_second else None
+    slots = asyncio.Semaphore(concurrency)
+
+    results = asyncio.Queue()
+
+    async def _one(index: int):
+        # Each item logs under "<batch request id>/<index>" (tasks own a context copy)
+        request_id_var.set(f"{request_id_var.get()}/{index}")
+        async with slots:
+            payload = payloads[index]
+            try:
+                if limiter:
+                    await limiter.acquire()
+                result = await generate_website_package_async(payload, timeout=payload.get("timeout_seconds"), per_section=bool(payload.get("per_section")))
+                await results.put({"event": "item", "index": index, "status": "ok", "result": result})
+            except Exception as e:
+                await results.put({"event": "item", "index": index, "status": "error", "error": repr(e)})
+
+    async def _group(indexes: List[int]):
+        # Batch refinement only warms the cache: if it fails, items refine on their own.
+        # Every index must still report, or the stream below would wait forever
+        try:
+            await _prerefine(payloads, indexes)
+        except Exception as e:
+            print("⚠️ Batch pre-refinement failed:", repr(e))
+        await asyncio.gather(*(_one(i) for i in indexes))
+
+    # Groups refine concurrently; each group's items start once it is refined
+    runner = asyncio.gather(*(_group(indexes) for indexes in groups.values()))
+    ok = 0
+    try:
+        for _ in range(len(payloads)):
+            event = await results.get()
+            ok += event["status"] == "ok"
+            yield event
+        await runner
+    finally:
+        # Client went away mid-stream: stop the remaining work
+        if not runner.done():
+            runner.cancel()
+            runner.add_done_callback(lambda f: None if f.cancelled() else f.exception())
+    yield {"event": "summary", "total": len(payloads), "ok": ok, "failed": len(payloads) - ok, "groups": len(groups)}
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+# ---------- CONFIG ----------
+CACHE_MAX_ENTRIES = int(os.environ.get("AGENT_CACHE_MAX_ENTRIES", 2048))
+CACHE_TTL_SECONDS = float(os.environ.get("AGENT_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+# Set to a file path to keep model outputs across restarts (SQLite)
+CACHE_DB_PATH = os.environ.get("AGENT_CACHE_PATH")
+
+# ---------- KEYS ----------
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+def cache_key(template: str, template_version: str, model_name: str, **inputs) -> str:
+    """
+    Content address for a model call: sha256 over the prompt template name and
+    version, the model name and the normalized inputs (case/whitespace-insensitive).
+    """
+    material = json.dumps(
+        {"t": template, "v": template_version, "m": model_name, "in": _normalize(inputs)},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+# ---------- BACKENDS ----------
+class LRUCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        with self._lock:
+            self._data[key] = (time.time() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    """On-disk cache that survives restarts. Values are stored as JSON."""
+
+    def __init__(self, path: str, ttl: float = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS model_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL);")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM model_cache WHERE key = ?;", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO model_cache (key, value, expires_at) VALUES (?, ?, ?);",
+                (key, json.dumps(value), time.time() + (ttl or self.ttl)),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM model_cache;")
+            self._conn.commit()
+
+# ---------- TIERED CACHE ----------
+class ModelCache:
+    """
+    Memory LRU in front of an optional disk backend, with hit/miss counters.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: LRUCache = None, disk: Optional[SQLiteCache] = None):
+        self.memory = memory or LRUCache()
+        self.disk = disk
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        self.stats["writes"] += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_backend": self.disk is not None,
+        }
+
+_cache = None
+
+def get_cache() -> ModelCache:
+    global _cache
+    if _cache is None:
+        _cache = ModelCache(disk=SQLiteCache(CACHE_DB_PATH) if CACHE_DB_PATH else None)
+    return _cache
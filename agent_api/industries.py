@@ -0,0 +1,115 @@
+import os
+import re
+import json
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# ---------- CONFIG ----------
+# One or more JSON files (os.pathsep-separated); later files add industries or
+# replace ones with the same id, so deployments can extend the bundled taxonomy
+INDUSTRY_DATA_PATH = os.environ.get("INDUSTRY_DATA_PATH", str(Path(__file__).with_name("industries.json")))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# ---------- INDUSTRY ----------
+class Industry:
+    """Everything derived from a website type: theme, chatbot FAQs and prompt hints."""
+
+    __slots__ = ("id", "label", "theme", "tone", "image_hints", "faqs")
+
+    def __init__(self, id: str, label: str, theme: str, tone: str, image_hints: str, faqs: Dict[str, str]):
+        self.id = id
+        self.label = label
+        self.theme = theme
+        self.tone = tone
+        self.image_hints = image_hints
+        # Shared by every lookup: treat as read-only
+        self.faqs = faqs
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "Industry":
+        return cls(entry["id"], entry.get("label") or entry["id"], entry["theme"], entry["tone"],
+                   entry["image_hints"], dict(entry["faqs"]))
+
+    def __repr__(self):
+        return f"Industry({self.id!r})"
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+# ---------- INDEX ----------
+class IndustryIndex:
+    """
+    Token trie over every keyword/synonym phrase ("clinic", "real estate", ...).
+    Matching is on whole tokens, so "it" does not fire inside "fitness" and
+    "hospitality" is not "hospital". The longest phrase wins; among equally long
+    matches the last one wins, as the head noun comes last in English compounds
+    ("restaurant software" is tech, "tech school" is education).
+    """
+
+    def __init__(self, default: Industry, industries: List[Tuple[Industry, List[str]]]):
+        self.default = default
+        self.industries: Dict[str, Industry] = {}
+        self._trie: dict = {}
+        self._vocab = set()
+        for industry, keywords in industries:
+            self.industries[industry.id] = industry
+            for phrase in keywords:
+                node = self._trie
+                for token in tokenize(phrase):
+                    self._vocab.add(token)
+                    node = node.setdefault(token, {})
+                node[""] = industry  # end of phrase; tokens are never empty
+
+    def lookup(self, website_type: str) -> Industry:
+        trie, vocab = self._trie, self._vocab
+        tokens = []
+        for token in _TOKEN.findall(website_type.lower()):
+            # Plural forms ("clinics", "restaurants") fall back to the singular keyword
+            if token not in vocab and token[-1] == "s" and token[:-1] in vocab:
+                token = token[:-1]
+            if token in vocab:
+                tokens.append(token)
+            elif tokens and tokens[-1] is not None:
+                tokens.append(None)  # breaks phrases across unknown words
+        best, best_len = None, 0
+        for start, token in enumerate(tokens):
+            node = trie.get(token)
+            end = start + 1
+            while node is not None:
+                length = end - start
+                if "" in node and length >= best_len:
+                    best, best_len = node[""], length
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return best or self.default
+
+def load_index(paths: str = INDUSTRY_DATA_PATH) -> IndustryIndex:
+    default, entries = None, {}
+    for path in filter(None, paths.split(os.pathsep)):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("default"):
+            default = Industry.from_entry(data["default"])
+        for entry in data.get("industries", []):
+            entries[entry["id"]] = (Industry.from_entry(entry), entry.get("keywords", []))
+    if default is None:
+        raise ValueError(f"No default industry in {paths}")
+    print(f"🏷️ Industry index loaded: {len(entries)} industries.")
+    return IndustryIndex(default, list(entries.values()))
+
+_index: Optional[IndustryIndex] = None
+
+def get_index() -> IndustryIndex:
+    # Built on first lookup and kept for the life of the worker
+    global _index
+    if _index is None:
+        _index = load_index()
+    return _index
+
+@lru_cache(maxsize=4096)
+def lookup_industry(website_type: str) -> Industry:
+    return get_index().lookup(website_type)
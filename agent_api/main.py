@@ -1,13 +1,25 @@
 import os
-from fastapi import FastAPI, Body
+import json
+import asyncio
+from fastapi import FastAPI, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, field_validator
-from typing import List, Optional
+from fastapi.responses import StreamingResponse, JSONResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
 
-from agent_logic import generate_website_package
+from agent_logic import generate_website_package_async, stream_website_package
+from cache import get_cache
+from batch import generate_batch
+from models import get_model, is_ready
+from agent_layer import REQUEST_TIMEOUT_SECONDS
+from industries import get_index
+import telemetry
 
 app = FastAPI(title="Website Generator Agent API")
 
+# X-Request-ID propagation, request latency histograms and GET /metrics
+telemetry.install(app)
+
 # CORS for agent↔agent / n8n
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +34,14 @@ class GenerateRequest(BaseModel):
     business_name: Optional[str] = None
     sections_required: List[str]
     callback_url_for_assets: Optional[str] = None
+    # One model call per section instead of one call for the whole site
+    per_section: bool = False
+    # Skip cached model outputs (fresh results are still written back)
+    bypass_cache: bool = False
+    # Link one content-hashed styles.<hash>.css instead of inlining CSS per page
+    external_styles: bool = False
+    # Overall time budget for this site; model calls share what is left of it
+    timeout_seconds: Optional[float] = Field(None, gt=0, le=REQUEST_TIMEOUT_SECONDS)
 
     @field_validator("sections_required")
     @classmethod
@@ -29,15 +49,73 @@ class GenerateRequest(BaseModel):
         # Trim whitespace-only items
         return [s for s in (v or []) if isinstance(s, str) and s.strip()]
 
+class BatchGenerateRequest(BaseModel):
+    items: List[GenerateRequest] = Field(..., min_length=1, max_length=1000)
+    # Items generated at once, and optional cap on item starts per second
+    concurrency: int = Field(8, ge=1, le=64)
+    rate_per_second: Optional[float] = Field(None, gt=0)
+
+def _warm_up():
+    # SDK import + client construction, cache open, industry index: done once per worker, off the event loop
+    get_model()
+    get_cache()
+    get_index()
+
+async def _warm_up_task():
+    try:
+        await asyncio.to_thread(_warm_up)
+        print("🔥 Model client ready")
+    except Exception as e:
+        app.state.warm_up_error = repr(e)
+        print("⚠️ Model client warm-up failed:", repr(e))
+
+@app.on_event("startup")
+async def startup():
+    app.state.warm_up_error = None
+    app.state.warm_up_task = asyncio.create_task(_warm_up_task())
+
 @app.get("/health")
 async def health():
+    # Liveness: the process is serving; see /ready for traffic readiness
     return {"status": "ok"}
 
+@app.get("/ready")
+async def ready():
+    if is_ready():
+        return {"status": "ready"}
+    detail = {"status": "starting", "error": getattr(app.state, "warm_up_error", None)}
+    return JSONResponse(detail, status_code=503)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return get_cache().snapshot()
+
 @app.post("/generate-website")
 async def generate_website(payload: GenerateRequest = Body(...)):
-    result = generate_website_package(payload.model_dump())
+    result = await generate_website_package_async(payload.model_dump(), timeout=payload.timeout_seconds, per_section=payload.per_section)
     return result
 
+@app.post("/generate-website/stream")
+async def generate_website_stream(payload: GenerateRequest = Body(...), format: Literal["ndjson", "sse"] = Query("ndjson")):
+    """Streams pages as each section finishes (always per-section)."""
+    async def events():
+        async for event in stream_website_package(payload.model_dump(), timeout=payload.timeout_seconds):
+            line = json.dumps(event)
+            yield f"event: {event['event']}\ndata: {line}\n\n" if format == "sse" else line + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+@app.post("/generate-websites/batch")
+async def generate_websites_batch(payload: BatchGenerateRequest = Body(...)):
+    """Streams one NDJSON line per item as it completes, then a summary line."""
+    async def events():
+        items = [item.model_dump() for item in payload.items]
+        async for event in generate_batch(items, concurrency=payload.concurrency, rate_per_second=payload.rate_per_second):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)), reload=True)
@@ -0,0 +1,35 @@
+import os
+import threading
+
+# ---------- CONFIG ----------
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+# 🔑 Required; never commit a key. Without one /ready stays 503 with the error.
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+
+# ---------- MODEL REGISTRY ----------
+# The SDK is imported and configured once, on first use (not at import time),
+# so /health answers immediately and each worker pays the cost only once.
+_models = {}
+_lock = threading.Lock()
+
+def model_name(name: str = GEMINI_MODEL) -> str:
+    # Same form as GenerativeModel.model_name, so cache keys need no SDK import
+    return name if "/" in name else f"models/{name}"
+
+def get_model(name: str = GEMINI_MODEL):
+    """Shared GenerativeModel per model name for every request on this worker."""
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            if name not in _models:
+                if not GEMINI_API_KEY:
+                    raise RuntimeError("Set GEMINI_API_KEY (or GOOGLE_API_KEY) to use the model")
+                import google.generativeai as genai
+                if not _models:
+                    genai.configure(api_key=GEMINI_API_KEY)
+                _models[name] = genai.GenerativeModel(name)
+            model = _models[name]
+    return model
+
+def is_ready() -> bool:
+    return GEMINI_MODEL in _models
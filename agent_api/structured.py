@@ -0,0 +1,161 @@
+import re
+import json
+from typing import Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# ---------- OUTPUT MODELS ----------
+class Section(BaseModel):
+    title: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+
+    @field_validator("content")
+    @classmethod
+    def _has_text(cls, v: str):
+        if not v.strip():
+            raise ValueError("Empty section content")
+        return v
+
+class Refinement(BaseModel):
+    business_name: str = Field(min_length=1)
+    website_type: str = Field(min_length=1)
+    sections: List[str]
+
+class BatchRefinement(Refinement):
+    # 1-based number of the input this result refines, echoed back by the model
+    index: int
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# ---------- INCREMENTAL EXTRACTOR ----------
+# Only these characters change the scanner state; everything else is skipped
+_STRUCTURAL = re.compile(r'[{}"\\]')
+
+class JsonObjectScanner:
+    """
+    Finds complete leaf JSON objects ({...} with no object nested inside) in text
+    that arrives in chunks. Code fences, prose around the JSON and a truncated
+    tail are ignored, so every object closed before the output broke is kept.
+    Strings and escapes are tracked across chunk boundaries.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[List] = []  # [start offset, has nested object]
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Adds a chunk; returns the raw text of each object it completed."""
+        self._buf += chunk
+        buf, pos, found = self._buf, self._pos, []
+        if self._escaped and pos < len(buf):
+            pos += 1
+            self._escaped = False
+        while True:
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            ch, pos = m.group(), m.end()
+            if self._in_string:
+                if ch == "\\":
+                    if pos == len(buf):
+                        self._escaped = True
+                        break
+                    pos += 1
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                # Quotes in prose outside any object are not JSON strings
+                self._in_string = bool(self._stack)
+            elif ch == "{":
+                if self._stack:
+                    self._stack[-1][1] = True
+                self._stack.append([m.start(), False])
+            elif ch == "}" and self._stack:
+                start, nested = self._stack.pop()
+                if not nested:
+                    found.append(buf[start:pos])
+        # Drop text no open object can still need
+        keep = self._stack[0][0] if self._stack else pos
+        if keep:
+            for entry in self._stack:
+                entry[0] -= keep
+            self._buf, pos = buf[keep:], pos - keep
+        self._pos = pos
+        return found
+
+def _load(raw: str) -> Optional[dict]:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def validate(raw: str, model: Type[Model]) -> Optional[Model]:
+    data = _load(raw)
+    if data is None:
+        return None
+    try:
+        return model.model_validate(data)
+    except ValidationError:
+        return None
+
+def extract_one(text: str, model: Type[Model]) -> Model:
+    """The first object in text that validates against model; ValueError if none does."""
+    for raw in JsonObjectScanner().feed(text):
+        obj = validate(raw, model)
+        if obj is not None:
+            return obj
+    raise ValueError(f"No valid {model.__name__} object in model output")
+
+def extract_positional(text: str, model: Type[Model]) -> List[Optional[Model]]:
+    """
+    Leaf objects in output order, with None for each one that is not valid JSON
+    or fails validation, so a malformed entry does not shift the ones after it.
+    Position alone cannot catch dropped or reordered entries; callers should
+    also check an identifier echoed in each object (see BatchRefinement.index).
+    """
+    return [validate(raw, model) for raw in JsonObjectScanner().feed(text)]
+
+# ---------- SECTIONS ----------
+def _norm_title(title: str) -> str:
+    return re.sub(r"\s+", " ", title).strip().casefold()
+
+def match_sections(found: Dict[str, str], requested: List[str]) -> Dict[str, str]:
+    """
+    Re-keys sections by the requested titles. Cache keys ignore case/whitespace,
+    so a hit may carry titles spelled differently from this request's.
+    """
+    by_norm = {_norm_title(title): text for title, text in found.items()}
+    return {s: by_norm[_norm_title(s)] for s in requested if _norm_title(s) in by_norm}
+
+class SectionCollector:
+    """
+    Feeds a (streamed) sections response through the scanner and keeps each
+    section that validates, keyed by the requested title it matches
+    (case/whitespace-insensitive). Sections the model invented are ignored.
+    """
+
+    def __init__(self, requested: List[str]):
+        self._titles = {_norm_title(s): s for s in requested}
+        self._scanner = JsonObjectScanner()
+        self.requested = list(requested)
+        self.sections: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> List[str]:
+        """Returns the requested titles completed by this chunk."""
+        done = []
+        for raw in self._scanner.feed(chunk):
+            section = validate(raw, Section)
+            title = self._titles.get(_norm_title(section.title)) if section else None
+            if title and title not in self.sections:
+                self.sections[title] = section.content
+                done.append(title)
+        return done
+
+    @property
+    def missing(self) -> List[str]:
+        return [s for s in self.requested if s not in self.sections]
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import contextvars
+from contextlib import contextmanager
+
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# ---------- CONFIG ----------
+SERVICE_NAME = "agent_api"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Model calls run from ~100ms (cache-warm) to the 60s timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# ---------- CONTEXT ----------
+request_id_var = contextvars.ContextVar("request_id", default=None)
+site_id_var = contextvars.ContextVar("site_id", default=None)
+_span_var = contextvars.ContextVar("span_id", default=None)
+
+# ---------- STRUCTURED LOGS ----------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, tagged with the current request/site id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "service": SERVICE_NAME,
+            "event": record.getMessage(),
+            "request_id": request_id_var.get(),
+            "site_id": site_id_var.get(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+logger = logging.getLogger(SERVICE_NAME)
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(JsonFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+# ---------- METRICS ----------
+HTTP_REQUESTS = Counter("agent_http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_SECONDS = Histogram("agent_http_request_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS)
+STAGE_SECONDS = Histogram("agent_stage_seconds", "Time spent per pipeline stage", ["stage"], buckets=LATENCY_BUCKETS)
+STAGE_ERRORS = Counter("agent_stage_errors_total", "Pipeline stage failures", ["stage", "error"])
+MODEL_CACHE_LOOKUPS = Counter("agent_model_cache_lookups_total", "Model output cache lookups", ["kind", "result"])
+MODEL_FALLBACKS = Counter("agent_model_fallbacks_total", "Model outputs replaced by a fallback", ["kind"])
+
+def record_cache_lookup(kind: str, hit: bool, bypass: bool = False):
+    MODEL_CACHE_LOOKUPS.labels(kind, "bypass" if bypass else "hit" if hit else "miss").inc()
+
+# ---------- SPANS ----------
+@contextmanager
+def span(stage: str, **fields):
+    """
+    Times a block into agent_stage_seconds{stage} and logs it as a span
+    (span_id/parent_id nest across awaits and tasks via contextvars).
+    Spans log at DEBUG (LOG_LEVEL=DEBUG for full traces), failed ones at WARNING;
+    exceptions are counted in agent_stage_errors_total and re-raised.
+    """
+    span_id = os.urandom(8).hex()
+    parent_id = _span_var.get()
+    token = _span_var.set(span_id)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = "error"
+        STAGE_ERRORS.labels(stage, type(e).__name__).inc()
+        fields["error"] = repr(e)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _span_var.reset(token)
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        log_event("span", logging.DEBUG if status == "ok" else logging.WARNING, stage=stage, span_id=span_id,
+                  parent_id=parent_id, duration_ms=round(elapsed * 1000, 2), status=status, **fields)
+
+# ---------- FASTAPI ----------
+def install(app):
+    """Adds request-id/latency middleware and GET /metrics to a FastAPI app."""
+
+    @app.middleware("http")
+    async def _telemetry(request: Request, call_next):
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        tokens = [request_id_var.set(request_id), site_id_var.set(request.query_params.get("site_id"))]
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            HTTP_REQUESTS.labels(request.method, route, str(status)).inc()
+            HTTP_SECONDS.labels(request.method, route).observe(elapsed)
+            log_event("request", method=request.method, route=route, status=status, duration_ms=round(elapsed * 1000, 2))
+            for var, token in zip((request_id_var, site_id_var), tokens):
+                var.reset(token)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
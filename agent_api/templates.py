@@ -0,0 +1,30 @@
+import re
+import sys
+from typing import Iterator
+
+# ---------- COMPILED PAGE TEMPLATES ----------
+# Slots are written as {{name}}; everything else is emitted verbatim, so CSS/JS
+# braces need no escaping.
+_SLOT = re.compile(r"\{\{(\w+)\}\}")
+
+class PageTemplate:
+    """
+    A template split once into literal fragments and slot names.
+    Rendering fills the slots and joins the parts in a single pass.
+    """
+
+    def __init__(self, source: str):
+        parts = _SLOT.split(source)
+        self._literals = tuple(sys.intern(p) for p in parts[0::2])
+        self.slots = tuple(parts[1::2])
+
+    def iter_render(self, **values) -> Iterator[str]:
+        """Yields the page piece by piece; render() joins them."""
+        literals = self._literals
+        yield literals[0]
+        for i, name in enumerate(self.slots, 1):
+            yield values[name]
+            yield literals[i]
+
+    def render(self, **values) -> str:
+        return "".join(self.iter_render(**values))
@@ -0,0 +1,47 @@
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import batch  # noqa: E402
+import agent_layer  # noqa: E402
+
+class BrokenCache:
+    def get(self, key):
+        raise ConnectionError("cache down")
+
+async def _collect(payloads):
+    return [event async for event in batch.generate_batch(payloads, concurrency=2)]
+
+def test_failed_prerefine_still_reports_every_item(monkeypatch):
+    async def generate(payload, **kwargs):
+        if payload["business_name"] == "Bad":
+            raise ValueError("boom")
+        return {"pages": []}
+
+    monkeypatch.setattr(agent_layer, "get_cache", BrokenCache)
+    monkeypatch.setattr(batch, "generate_website_package_async", generate)
+    payloads = [{"business_name": name, "website_type": kind}
+                for name, kind in [("A", "clinic"), ("Bad", "clinic"), ("C", "bakery")]]
+
+    events = asyncio.run(asyncio.wait_for(_collect(payloads), 5))
+
+    items = {e["index"]: e["status"] for e in events if e["event"] == "item"}
+    assert items == {0: "ok", 1: "error", 2: "ok"}
+    assert events[-1] == {"event": "summary", "total": 3, "ok": 2, "failed": 1, "groups": 2}
+
+def test_prerefine_error_does_not_hang_the_stream(monkeypatch):
+    async def broken(items, timeout=None):
+        raise RuntimeError("refine exploded")
+
+    async def generate(payload, **kwargs):
+        return {"pages": []}
+
+    monkeypatch.setattr(batch, "refine_website_inputs_batch_async", broken)
+    monkeypatch.setattr(batch, "generate_website_package_async", generate)
+    payloads = [{"business_name": "A", "website_type": "clinic"}, {"business_name": "B", "website_type": "gym"}]
+
+    events = asyncio.run(asyncio.wait_for(_collect(payloads), 5))
+
+    assert events[-1]["event"] == "summary" and events[-1]["ok"] == 2
@@ -0,0 +1,17 @@
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cache import get_cache  # noqa: E402
+from agent_logic import content_cache_key, generate_sections_with_gemini_async  # noqa: E402
+
+def test_cache_hit_is_keyed_by_requested_titles():
+    # Keys ignore case, so "about" hits the entry written for "About"
+    written = {"About": "About text", "Menu": "Menu text"}
+    get_cache().set(content_cache_key("Cafe X", "restaurant", list(written)), written)
+
+    result = asyncio.run(generate_sections_with_gemini_async("Cafe X", "restaurant", ["about", " MENU "]))
+
+    assert result == {"about": "About text", " MENU ": "Menu text"}
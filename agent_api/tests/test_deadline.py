@@ -0,0 +1,25 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import agent_layer  # noqa: E402
+import agent_logic  # noqa: E402
+
+class HangingModel:
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(3600)
+
+def test_whole_generation_respects_request_budget(monkeypatch):
+    monkeypatch.setattr(agent_layer, "get_model", HangingModel)
+    monkeypatch.setattr(agent_logic, "get_model", HangingModel)
+    payload = {"business_name": "Deadline Co", "website_type": "bakery", "sections_required": ["A", "B"], "bypass_cache": True}
+
+    start = time.monotonic()
+    package = asyncio.run(agent_logic.generate_website_package_async(payload, timeout=0.5))
+
+    # Refine, content and the per-section retries all share the one budget
+    assert time.monotonic() - start < 1.5
+    assert len(package["pages"]) == 3
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from industries import load_index  # noqa: E402
+
+@pytest.fixture(scope="module")
+def index():
+    return load_index()
+
+@pytest.mark.parametrize("website_type, industry", [
+    ("Hospital", "health"),
+    ("Dental Clinics", "health"),
+    ("Urgent care clinic", "health"),
+    ("Health care provider", "health"),
+    ("Lawn care services", "general"),
+    ("Car care", "general"),
+    ("Pet care", "general"),
+    ("Skin care studio", "wellness"),
+    ("Child care center", "education"),
+    ("IT Consulting", "tech"),
+    ("Software consulting", "tech"),
+    ("Technology Consulting", "tech"),
+    ("Tax consulting", "legal"),
+    ("Law firm", "legal"),
+    ("Restaurant software", "tech"),
+    ("Tech school", "education"),
+    ("Fitness studio", "fitness"),
+    ("Hospitality group", "hospitality"),
+])
+def test_website_type_maps_to_industry(index, website_type, industry):
+    # Only multi-word phrases claim "care"; "consulting" alone stays legal/financial
+    assert index.lookup(website_type).id == industry
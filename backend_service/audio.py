@@ -0,0 +1,105 @@
+import os
+import shutil
+import asyncio
+import mimetypes
+from pathlib import Path
+from typing import Dict, List
+
+from fsutil import file_sha256, load_variants, save_variants
+
+# ---------- CONFIG ----------
+FFMPEG = os.environ.get("FFMPEG_PATH") or shutil.which("ffmpeg")
+OPUS_BITRATE = os.environ.get("AUDIO_OPUS_BITRATE", "48k")
+AAC_BITRATE = os.environ.get("AUDIO_AAC_BITRATE", "64k")
+# EBU R128-style single pass: -16 LUFS integrated, -1.5 dBTP ceiling
+LOUDNORM_FILTER = os.environ.get("AUDIO_LOUDNORM_FILTER", "loudnorm=I=-16:TP=-1.5:LRA=11")
+MAX_CONCURRENT_TRANSCODES = int(os.environ.get("MAX_CONCURRENT_TRANSCODES", os.cpu_count() or 2))
+SOURCE_SUFFIXES = {".mp3", ".wav", ".m4a", ".aac", ".ogg", ".opus", ".webm", ".flac"}
+
+# Output order is <source> order in the player: Opus first, AAC for Safari/older iOS
+AUDIO_OUTPUTS = [
+    ("webm", "audio/webm; codecs=opus", ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-vbr", "constrained"]),
+    ("m4a", "audio/mp4", ["-c:a", "aac", "-b:a", AAC_BITRATE, "-movflags", "+faststart"]),
+]
+
+def _settings() -> str:
+    return f"{FFMPEG is not None}|{OPUS_BITRATE}|{AAC_BITRATE}|{LOUDNORM_FILTER}"
+
+_transcode_slots = None
+
+def transcode_slots() -> asyncio.Semaphore:
+    global _transcode_slots
+    if _transcode_slots is None:
+        _transcode_slots = asyncio.Semaphore(MAX_CONCURRENT_TRANSCODES)
+    return _transcode_slots
+
+# ---------- TRANSCODE ----------
+async def _ffmpeg(src: Path, dst: Path, codec_args: List[str]):
+    tmp = dst.with_name(f".{dst.name}.tmp{dst.suffix}")
+    async with transcode_slots():
+        proc = await asyncio.create_subprocess_exec(
+            FFMPEG, "-nostdin", "-y", "-v", "error", "-i", str(src),
+            "-vn", "-map_metadata", "-1", "-af", LOUDNORM_FILTER, *codec_args, str(tmp),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg exited with {proc.returncode}: {stderr.decode(errors='replace')[-300:]}")
+    os.replace(tmp, dst)
+
+async def transcode_audio(src: Path, out_dir: Path, audio_id: str) -> List[List[str]]:
+    """Opus + AAC renditions of one track; returns [[filename, mime type], ...] in player order."""
+    files = [[f"{audio_id}.{ext}", mime] for ext, mime, _ in AUDIO_OUTPUTS]
+    await asyncio.gather(*(
+        _ffmpeg(src, out_dir / name, codec_args)
+        for (name, _), (_, _, codec_args) in zip(files, AUDIO_OUTPUTS)
+    ))
+    return files
+
+def _publish_original(src: Path, out_dir: Path, audio_id: str) -> List[List[str]]:
+    name = f"{audio_id}{src.suffix.lower()}"
+    shutil.copyfile(src, out_dir / name)
+    return [[name, mimetypes.guess_type(name)[0] or "audio/mpeg"]]
+
+# ---------- PIPELINE ----------
+async def optimize_audio(src_dir: Path, out_dir: Path) -> Dict[str, dict]:
+    """
+    Publishes every source track in src_dir as loudness-normalised, bitrate-capped
+    Opus/AAC files in out_dir (the original is copied when ffmpeg is unavailable
+    or fails). Tracks whose sha256 and settings match the last run are skipped.
+    Returns audio_id → {"files": [[filename, mime type], ...], "sha256"}.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    variants = load_variants(out_dir)
+    pending = {}
+    for src in sorted(src_dir.glob("*")) if src_dir.exists() else []:
+        if src.suffix.lower() not in SOURCE_SUFFIXES or src.name.startswith("."):
+            continue
+        audio_id = src.stem
+        sha256 = await asyncio.to_thread(file_sha256, src)
+        known = variants.get(audio_id)
+        if (known and known["sha256"] == sha256 and known.get("settings") == _settings()
+                and all((out_dir / name).exists() for name, _ in known["files"])):
+            continue
+        pending[audio_id] = (src, sha256)
+
+    async def _one(audio_id: str, src: Path):
+        if FFMPEG:
+            try:
+                return await transcode_audio(src, out_dir, audio_id)
+            except Exception as e:
+                print(f"⚠️  Could not transcode audio '{audio_id}', publishing original: {e}")
+        return await asyncio.to_thread(_publish_original, src, out_dir, audio_id)
+
+    results = await asyncio.gather(*(_one(audio_id, src) for audio_id, (src, _) in pending.items()))
+    for (audio_id, (_, sha256)), files in zip(pending.items(), results):
+        previous = variants.get(audio_id)
+        if previous:
+            for stale in {name for name, _ in previous["files"]} - {name for name, _ in files}:
+                (out_dir / stale).unlink(missing_ok=True)
+        variants[audio_id] = {"files": files, "sha256": sha256, "settings": _settings()}
+    if pending:
+        save_variants(out_dir, variants)
+        print(f"🎧 Published {len(pending)} audio track(s) ({'opus + aac' if FFMPEG else 'original format'})")
+    return variants
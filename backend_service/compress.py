@@ -0,0 +1,130 @@
+import os
+import re
+import gzip
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:  # gzip-only builds when the brotli wheel is unavailable
+    brotli = None
+
+from fsutil import load_json, write_json_atomic
+from process_pool import get_process_pool
+
+# ---------- CONFIG ----------
+BUILD_WORKERS = int(os.environ.get("BUILD_WORKERS", os.cpu_count() or 2))
+# Rebuilds this small (the usual asset deploy) are cheaper inline than shipped to workers
+BUILD_INLINE_MAX = int(os.environ.get("BUILD_INLINE_MAX", 8))
+BUILD_MANIFEST = ".build_manifest.json"
+# Text files that are minified (html/css) and/or precompressed
+MINIFY_SUFFIXES = {".html", ".css"}
+COMPRESS_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+# Not worth a Content-Encoding round trip below this size
+MIN_COMPRESS_BYTES = 512
+
+# ---------- MINIFY ----------
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{}:;,>])\s*")
+_WS = re.compile(r"\s+")
+# Placeholder comments must survive: assets are injected into the source pages later
+_HTML_COMMENT = re.compile(r"<!--(?!\s*(?:IMAGE_PLACEHOLDER|VOICE_PLACEHOLDER)).*?-->", re.S)
+_RAW_BLOCK = re.compile(r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2>)", re.S | re.I)
+_BLOCK_TAGS = "html|head|body|meta|title|link|style|script|nav|section|div|p|h[1-6]|ul|ol|li|footer|header|main|audio|source|picture"
+_BLOCK_GAP = re.compile(rf"\s*(</?(?:{_BLOCK_TAGS})\b[^>]*>)\s*", re.I)
+
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT.sub("", css)
+    css = _WS.sub(" ", css)
+    css = _CSS_SPACE.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+def minify_html(html: str) -> str:
+    """
+    Conservative minifier: drops comments (except asset placeholders), collapses
+    whitespace runs to one space and removes whitespace around block-level tags.
+    <pre>/<textarea>/<script> bodies are kept verbatim; <style> bodies go through minify_css.
+    """
+    raw = []
+
+    def _stash(m):
+        tag = m.group(2).lower()
+        body = minify_css(m.group(3)) if tag == "style" else m.group(3)
+        raw.append(m.group(1) + body + m.group(4))
+        return f"\x00{len(raw) - 1}\x00"
+
+    html = _RAW_BLOCK.sub(_stash, html)
+    html = _HTML_COMMENT.sub("", html)
+    html = _WS.sub(" ", html)
+    html = _BLOCK_GAP.sub(r"\1", html)
+    html = re.sub(r"\s*\x00(\d+)\x00\s*", lambda m: raw[int(m.group(1))], html)
+    return html.strip()
+
+# ---------- BUILD ----------
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _build_one(src: str, dst: str) -> str:
+    """Minifies/compresses one text file into dist. Runs in a worker process."""
+    src_path, dst_path = Path(src), Path(dst)
+    data = src_path.read_bytes()
+    if src_path.suffix in MINIFY_SUFFIXES:
+        text = data.decode("utf-8")
+        data = (minify_html(text) if src_path.suffix == ".html" else minify_css(text)).encode("utf-8")
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    dst_path.write_bytes(data)
+
+    for ext in (".gz", ".br"):
+        Path(dst + ext).unlink(missing_ok=True)
+    if len(data) >= MIN_COMPRESS_BYTES:
+        # mtime=0 keeps identical input → identical bytes (stable ETags)
+        Path(dst + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            Path(dst + ".br").write_bytes(brotli.compress(data, quality=11))
+    return dst
+
+def build_dist(site_dir: Path, dist_dir: Path, workers: int = BUILD_WORKERS) -> Dict[str, List[str]]:
+    """
+    Mirrors site_dir into dist_dir: html/css minified, text files precompressed
+    (.gz always, .br when brotli is installed), everything else copied as-is.
+    Sources whose sha256 matches the last build are skipped.
+    """
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = dist_dir / BUILD_MANIFEST
+    previous = load_json(manifest_path)
+
+    current, text_jobs, built, skipped = {}, [], [], []
+    for src in sorted(site_dir.rglob("*")):
+        rel = src.relative_to(site_dir)
+        if not src.is_file() or any(part.startswith(".") for part in rel.parts):
+            continue
+        key, dst = rel.as_posix(), dist_dir / rel
+        digest = _sha256(src.read_bytes())
+        current[key] = digest
+        if previous.get(key) == digest and dst.exists():
+            skipped.append(key)
+            continue
+        if src.suffix in COMPRESS_SUFFIXES:
+            text_jobs.append((str(src), str(dst)))
+        else:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst)
+        built.append(key)
+
+    if text_jobs:
+        if len(text_jobs) <= BUILD_INLINE_MAX or workers <= 1:
+            for src, dst in text_jobs:
+                _build_one(src, dst)
+        else:
+            list(get_process_pool("build", workers).map(_build_one, *zip(*text_jobs)))
+
+    removed = [key for key in previous if key not in current]
+    for key in removed:
+        for ext in ("", ".gz", ".br"):
+            (dist_dir / (key + ext)).unlink(missing_ok=True)
+
+    write_json_atomic(manifest_path, current)
+    print(f"🗜️ Build: {len(built)} rebuilt, {len(skipped)} unchanged, {len(removed)} removed")
+    return {"built": built, "skipped": skipped, "removed": removed}
@@ -1,11 +1,154 @@
 import os
+import time
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Sequence
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "site.db")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+# ---------- CONFIG ----------
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+BUSY_TIMEOUT_SECONDS = float(os.environ.get("DB_BUSY_TIMEOUT_SECONDS", 5))
+# Prepared statements kept per connection (sqlite3's LRU statement cache)
+STATEMENT_CACHE_SIZE = 256
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    # Durable across process crashes; only an OS crash can lose the last commits
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    return conn
+
 def get_conn():
-    return sqlite3.connect(DB_PATH)
+    """A standalone tuned connection; the caller closes it. Prefer transaction()."""
+    return _connect(DB_PATH)
+
+# ---------- POOL ----------
+class ConnectionPool:
+    """Thread-safe pool of long-lived WAL connections."""
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return _connect(self.path)
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH:
+            _pool = ConnectionPool(DB_PATH)
+            migrate(_pool)
+        return _pool
+
+@contextmanager
+def transaction():
+    """Pooled connection that commits on success and rolls back on error."""
+    with get_pool().connection() as conn:
+        yield conn
+        conn.commit()
+
+def execute(sql: str, params: Sequence = ()) -> List[tuple]:
+    with transaction() as conn:
+        return conn.execute(sql, params).fetchall()
+
+def executemany(sql: str, rows: Iterable[Sequence]) -> int:
+    with transaction() as conn:
+        return conn.executemany(sql, rows).rowcount
+
+def bulk_insert(table: str, rows: List[Dict], replace: bool = False) -> int:
+    """Inserts dict rows (same keys) with one executemany in one transaction."""
+    if not rows:
+        return 0
+    cols = list(rows[0])
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    sql = f"{verb} INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)});"
+    return executemany(sql, [tuple(r[c] for c in cols) for r in rows])
+
+# ---------- MIGRATIONS ----------
+# Append-only: (version, statements). PRAGMA user_version records the last applied.
+MIGRATIONS = [
+    (1, [
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, kind TEXT NOT NULL, site_id TEXT NOT NULL, status TEXT NOT NULL,
+            result TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL
+        );""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_site ON jobs (site_id, status);",
+    ]),
+    (2, [
+        """CREATE TABLE IF NOT EXISTS sites (
+            site_id TEXT PRIMARY KEY, business_name TEXT, website_type TEXT, status TEXT NOT NULL,
+            s3_prefix TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, last_deployed_at REAL
+        );""",
+        "CREATE INDEX IF NOT EXISTS idx_sites_status ON sites (status, updated_at);",
+        """CREATE TABLE IF NOT EXISTS pages (
+            site_id TEXT NOT NULL, filename TEXT NOT NULL, sha256 TEXT NOT NULL, bytes INTEGER NOT NULL,
+            updated_at REAL NOT NULL, PRIMARY KEY (site_id, filename)
+        );""",
+        """CREATE TABLE IF NOT EXISTS assets (
+            site_id TEXT NOT NULL, path TEXT NOT NULL, kind TEXT NOT NULL, sha256 TEXT, bytes INTEGER,
+            source_url TEXT, updated_at REAL NOT NULL, PRIMARY KEY (site_id, path)
+        );""",
+        "CREATE INDEX IF NOT EXISTS idx_assets_sha256 ON assets (sha256);",
+    ]),
+]
+
+def migrate(pool: ConnectionPool = None) -> int:
+    """Applies pending migrations, each in its own transaction. Returns the schema version."""
+    with (pool or get_pool()).connection() as conn:
+        version = conn.execute("PRAGMA user_version;").fetchone()[0]
+        for target, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            conn.execute("BEGIN IMMEDIATE;")
+            for stmt in statements:
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version = {target};")
+            conn.commit()
+            version = target
+            print(f"🗄️ Database migrated to v{version}")
+        return version
 
 def apply_schema(schema):
     conn = get_conn()
@@ -15,3 +158,25 @@ def apply_schema(schema):
         cur.execute(f"CREATE TABLE IF NOT EXISTS {table['name']} ({cols});")
     conn.commit()
     conn.close()
+
+# ---------- SITES / PAGES / ASSETS ----------
+def upsert_site(site_id: str, **fields):
+    now = time.time()
+    cols = ["site_id", "created_at", "updated_at", "status"] + [k for k in fields if k != "status"]
+    values = [site_id, now, now, fields.get("status", "created")] + [v for k, v in fields.items() if k != "status"]
+    updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c not in ("site_id", "created_at"))
+    execute(
+        f"INSERT INTO sites ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+        f"ON CONFLICT (site_id) DO UPDATE SET {updates};",
+        values,
+    )
+
+def record_pages(site_id: str, pages: List[Dict]):
+    """pages: [{"filename", "sha256", "bytes"}]"""
+    now = time.time()
+    return bulk_insert("pages", [{"site_id": site_id, "updated_at": now, **p} for p in pages], replace=True)
+
+def record_assets(site_id: str, assets: List[Dict]):
+    """assets: [{"path", "kind", "sha256", "bytes", "source_url"}]"""
+    now = time.time()
+    return bulk_insert("assets", [{"site_id": site_id, "updated_at": now, **a} for a in assets], replace=True)
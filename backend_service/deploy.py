@@ -1,49 +1,54 @@
-import subprocess
 from pathlib import Path
-import requests
-import boto3
 from datetime import datetime
 import json
+import sys
+import time
+import asyncio
+from s3_deployer import deploy_site, get_client
+from compress import build_dist
+from images import optimize_images
+from audio import optimize_audio
+from placeholders import inject_assets, VOICE_ID, LEGACY_VOICE
+from workspaces import Workspace, DEFAULT_SITE_ID
+from event_log import get_event_log
+from db import upsert_site
+from telemetry import span
 
 # ---------- AWS CONFIG ----------
 S3_BUCKET = "my-website-agent-output"
 CLOUDFRONT_ID = "E25Q9X6SJA9ERD"
 DYNAMO_TABLE = "WebsiteDeployments"  # ✅ create this table in DynamoDB
 AWS_REGION = "us-east-1"
+CLOUDFRONT_URL = "https://d35x17h179ym5e.cloudfront.net"
 
 # ---------- FRIEND AGENT ----------
 FRIEND_CALLBACK_URL = "https://webhook.site/bfdf0876-a200-4f30-8df1-88d0ca1c40e9"  # 🔄 update
 
 BASE_DIR = Path(__file__).resolve().parent
-STATIC_SITE_DIR = BASE_DIR / "static_site"
+
+def site_url(site_id: str = DEFAULT_SITE_ID) -> str:
+    return f"{CLOUDFRONT_URL}/{Workspace(site_id).s3_prefix}"
 
 # ---------- DYNAMODB LOGGER ----------
-def log_to_dynamodb(status: str, message: str):
+def log_to_dynamodb(status: str, message: str, site_id: str = DEFAULT_SITE_ID) -> str:
     """
     Records each deployment event in DynamoDB.
-    Partition key: 'deployment_id' (timestamp-based unique key)
+    Partition key: 'deployment_id' (timestamp + random suffix, unique per event)
+    The event is committed to a local outbox and shipped in batches in the background.
     """
     try:
-        dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-        table = dynamodb.Table(DYNAMO_TABLE)
-
-        item = {
-            "deployment_id": datetime.utcnow().strftime("%Y%m%d%H%M%S"),
-            "timestamp": datetime.utcnow().isoformat(),
-            "status": status,
-            "message": message,
-            "s3_bucket": S3_BUCKET,
-            "cloudfront_id": CLOUDFRONT_ID,
-            "cloudfront_url": "https://d35x17h179ym5e.cloudfront.net"
-        }
-
-        table.put_item(Item=item)
-        print("🗂️  Logged deployment to DynamoDB successfully.")
+        return get_event_log(DYNAMO_TABLE, AWS_REGION).record(
+            status, message,
+            s3_bucket=S3_BUCKET,
+            cloudfront_id=CLOUDFRONT_ID,
+            cloudfront_url=site_url(site_id),
+            site_id=site_id,
+        )
     except Exception as e:
         print(f"⚠️  Failed to log to DynamoDB: {e}")
 
 # ---------- FRIEND CALLBACK ----------
-def notify_friend_agent():
+def notify_friend_agent(site_id: str = DEFAULT_SITE_ID):
     """
     Sends a POST request to your friend's agent once deployment completes successfully.
     """
@@ -51,11 +56,13 @@ def notify_friend_agent():
         "status": "success",
         "timestamp": datetime.utcnow().isoformat(),
         "message": "✅ Website deployed successfully to AWS S3 + CloudFront",
-        "cloudfront_url": "https://d35x17h179ym5e.cloudfront.net",
-        "s3_bucket": S3_BUCKET
+        "cloudfront_url": site_url(site_id),
+        "s3_bucket": S3_BUCKET,
+        "site_id": site_id
     }
 
     try:
+        import requests  # only needed once a deploy finishes
         print("📡 Notifying Friend Agent...")
         response = requests.post(FRIEND_CALLBACK_URL, json=payload, timeout=8)
         if response.status_code == 200:
@@ -65,31 +72,68 @@ def notify_friend_agent():
     except Exception as e:
         print(f"❌ Failed to notify Friend Agent: {e}")
 
+def warm_clients():
+    """Creates the pooled S3/CloudFront clients ahead of the first deploy."""
+    get_client("s3", AWS_REGION)
+    get_client("cloudfront", AWS_REGION)
+
 # ---------- DEPLOY ----------
-def deploy():
-    print("🚀 Deploying website to S3...")
-
-    # ✅ Sync with trailing slashes (ensures deletion correctness)
-    sync_cmd = f"aws s3 sync {STATIC_SITE_DIR}/ s3://{S3_BUCKET}/ --delete"
-    print(f"🔧 Running: {sync_cmd}")
-    subprocess.call(sync_cmd, shell=True)
-
-    print("🔄 Invalidating CloudFront Cache...")
-    invalidate_cmd = (
-        f"aws cloudfront create-invalidation "
-        f"--distribution-id {CLOUDFRONT_ID} "
-        f"--paths '/*'"
+def deploy(site_id: str = DEFAULT_SITE_ID):
+    ws = Workspace(site_id)
+    print(f"🚀 Deploying site '{site_id}' to s3://{S3_BUCKET}/{ws.s3_prefix}")
+
+    # ✅ Minify + precompress into dist/ (unchanged sources are skipped)
+    with span("deploy.build"):
+        build_dist(ws.site_dir, ws.dist_dir)
+
+    # ✅ Upload only changed files, delete removed ones, invalidate touched paths
+    summary = deploy_site(
+        ws.dist_dir, S3_BUCKET, CLOUDFRONT_ID, ws.manifest_path, prefix=ws.s3_prefix,
+        s3=get_client("s3", AWS_REGION), cloudfront=get_client("cloudfront", AWS_REGION), exclude=ws.s3_exclude,
     )
-    print(f"🔧 Running: {invalidate_cmd}")
-    subprocess.call(invalidate_cmd, shell=True)
+    print(f"📦 Uploaded {len(summary['uploaded'])}, deleted {len(summary['deleted'])}, unchanged {summary['unchanged']}")
+    if summary["invalidation_id"]:
+        print(f"🔄 CloudFront invalidation {summary['invalidation_id']} created")
 
     print("✅ Deployment fully complete! 🎉")
+    upsert_site(site_id, status="deployed", s3_prefix=ws.s3_prefix, last_deployed_at=time.time())
 
     # ✅ Log to DynamoDB
-    log_to_dynamodb("success", "Website deployed successfully to AWS S3 + CloudFront.")
+    with span("dynamodb.record"):
+        deployment_id = log_to_dynamodb("success", "Website deployed successfully to AWS S3 + CloudFront.", site_id)
 
     # ✅ Send callback notification
-    notify_friend_agent()
+    with span("callback.notify"):
+        notify_friend_agent(site_id)
+
+    return {**summary, "site_id": site_id, "url": site_url(site_id), "deployment_id": deployment_id}
+
+# ---------- PUBLISH (deploy job) ----------
+async def publish(site_id: str = DEFAULT_SITE_ID):
+    """
+    The queued deploy job: transcodes new/changed media, fills the placeholders,
+    then deploys. Runs off the request path, one job per site at a time.
+    """
+    ws = Workspace(site_id)
+
+    # ✅ Resize + transcode new/changed images (WebP/AVIF srcsets), cached by source hash
+    images = {p.stem: None for p in ws.img_dir.glob("*.png")}  # legacy sites: original PNGs
+    with span("transcode.images"):
+        images.update(await asyncio.to_thread(optimize_images, ws.img_src_dir, ws.img_dir))
+
+    # ✅ Loudness-normalise + transcode narration to Opus/AAC, cached by source hash
+    with span("transcode.audio"):
+        voices = await optimize_audio(ws.audio_src_dir, ws.audio_dir)
+    voice = voices.get(VOICE_ID) or (LEGACY_VOICE if (ws.audio_dir / "site_intro.mp3").exists() else None)
+
+    # ✅ Insert images + voice player into site pages (replace placeholders)
+    with span("inject"):
+        rewritten = await asyncio.to_thread(inject_assets, ws.site_dir, images, voice)
+    print(f"🧩 Placeholders filled in {len(rewritten)} page(s)")
+
+    summary = await asyncio.to_thread(deploy, site_id)
+    return {**summary, "pages_rewritten": len(rewritten)}
 
 if __name__ == "__main__":
-    deploy()
+    # python3 deploy.py [site_id]
+    deploy(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SITE_ID)
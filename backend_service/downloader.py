@@ -0,0 +1,142 @@
+import os
+import random
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+from fsutil import file_sha256, load_json, write_json_atomic
+from telemetry import span, DOWNLOADS
+
+# ---------- CONFIG ----------
+MAX_PARALLEL_DOWNLOADS = int(os.environ.get("MAX_PARALLEL_DOWNLOADS", 8))
+DOWNLOAD_TIMEOUT_SECONDS = float(os.environ.get("DOWNLOAD_TIMEOUT_SECONDS", 30))
+MAX_DOWNLOAD_BYTES = int(os.environ.get("MAX_DOWNLOAD_BYTES", 25 * 1024 * 1024))
+DOWNLOAD_RETRIES = int(os.environ.get("DOWNLOAD_RETRIES", 3))
+CHUNK_SIZE = 64 * 1024
+# Per-directory record of url / ETag / sha256 for every downloaded file
+REGISTRY_NAME = ".downloads.json"
+
+class DownloadTooLarge(Exception):
+    pass
+
+# ---------- HTTP CLIENT ----------
+_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive pool for every download on this worker."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DOWNLOAD_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=MAX_PARALLEL_DOWNLOADS * 2, max_keepalive_connections=MAX_PARALLEL_DOWNLOADS),
+            follow_redirects=True,
+        )
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# ---------- REGISTRY ----------
+def load_registry(directory: Path) -> Dict[str, dict]:
+    return load_json(directory / REGISTRY_NAME)
+
+def save_registry(directory: Path, registry: Dict[str, dict]):
+    write_json_atomic(directory / REGISTRY_NAME, registry)
+
+# ---------- DOWNLOAD ----------
+async def _fetch_to_temp(client: httpx.AsyncClient, url: str, out_path: Path, headers: dict, max_bytes: int):
+    """Streams the body into a temp file next to out_path. Returns (status, tmp_path, sha256, etag)."""
+    async with client.stream("GET", url, headers=headers) as r:
+        if r.status_code == 304:
+            return 304, None, None, None
+        r.raise_for_status()
+        if int(r.headers.get("content-length") or 0) > max_bytes:
+            raise DownloadTooLarge(f"{url} declares {r.headers['content-length']} bytes")
+
+        fd, tmp_name = tempfile.mkstemp(dir=out_path.parent, prefix=".dl-")
+        h, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in r.aiter_bytes(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise DownloadTooLarge(f"{url} exceeds {max_bytes} bytes")
+                    h.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return r.status_code, Path(tmp_name), h.hexdigest(), r.headers.get("etag")
+
+async def download(url: str, out_path: Path, registry: Dict[str, dict] = None, client: httpx.AsyncClient = None,
+                   max_bytes: int = MAX_DOWNLOAD_BYTES) -> dict:
+    """
+    Downloads url to out_path atomically (temp file + rename), retrying transient
+    failures with exponential backoff. A file whose content is unchanged (304 or
+    same sha256) is left untouched. Returns {"url", "path", "status", "sha256"}.
+    """
+    client = client or get_http_client()
+    registry = registry if registry is not None else {}
+    known = registry.get(out_path.name, {})
+    headers = {}
+    if out_path.exists() and known.get("url") == url and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+
+    print(f"📥 Downloading → {url}")
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            status, tmp, sha256, etag = await _fetch_to_temp(client, url, out_path, headers, max_bytes)
+            break
+        except DownloadTooLarge as e:
+            print(f"⚠️ Skipped → {e}")
+            return {"url": url, "path": str(out_path), "status": "too_large", "sha256": None}
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in (408, 429) or e.response.status_code >= 500
+            if not retryable or attempt == DOWNLOAD_RETRIES:
+                print(f"⚠️ Failed → {url}: {e!r}")
+                return {"url": url, "path": str(out_path), "status": "failed", "sha256": None}
+            await asyncio.sleep(0.5 * 2 ** attempt + random.uniform(0, 0.25))
+
+    if status == 304:
+        print(f"♻️ Unchanged (304) → {out_path}")
+        return {"url": url, "path": str(out_path), "status": "unchanged", "sha256": known.get("sha256")}
+
+    current = known.get("sha256") if known.get("sha256") else (file_sha256(out_path) if out_path.exists() else None)
+    if out_path.exists() and current == sha256:
+        tmp.unlink()
+        registry[out_path.name] = {"url": url, "etag": etag, "sha256": sha256}
+        print(f"♻️ Unchanged (checksum) → {out_path}")
+        return {"url": url, "path": str(out_path), "status": "unchanged", "sha256": sha256}
+
+    os.replace(tmp, out_path)
+    registry[out_path.name] = {"url": url, "etag": etag, "sha256": sha256}
+    print(f"✅ Saved → {out_path}")
+    return {"url": url, "path": str(out_path), "status": "downloaded", "sha256": sha256}
+
+async def download_all(jobs: List[Tuple[str, Path]], parallel: int = MAX_PARALLEL_DOWNLOADS) -> List[dict]:
+    """Runs (url, out_path) downloads with bounded parallelism and persists the registries."""
+    slots = asyncio.Semaphore(parallel)
+    registries = {}
+    for _, out_path in jobs:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if out_path.parent not in registries:
+            registries[out_path.parent] = load_registry(out_path.parent)
+
+    async def _one(url: str, out_path: Path):
+        async with slots:
+            with span("download", url=url):
+                result = await download(url, out_path, registries[out_path.parent])
+            DOWNLOADS.labels(result["status"]).inc()
+            return result
+
+    results = await asyncio.gather(*(_one(url, out_path) for url, out_path in jobs))
+    for directory, registry in registries.items():
+        save_registry(directory, registry)
+    return results
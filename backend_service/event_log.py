@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict
+
+from db import DB_PATH
+from telemetry import span, DYNAMO_EVENTS
+
+# ---------- CONFIG ----------
+OUTBOX_PATH = os.path.join(os.path.dirname(DB_PATH), "event_outbox.db")
+FLUSH_INTERVAL_SECONDS = float(os.environ.get("EVENT_FLUSH_INTERVAL_SECONDS", 2))
+FLUSH_BATCH_SIZE = int(os.environ.get("EVENT_FLUSH_BATCH_SIZE", 100))
+# Point at DynamoDB Local / moto server for testing
+DYNAMO_ENDPOINT_URL = os.environ.get("DYNAMO_ENDPOINT_URL")
+
+def new_deployment_id() -> str:
+    """Time-sortable and collision-free: second timestamp + random suffix."""
+    return f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:12]}"
+
+# ---------- EVENT LOG ----------
+class DeploymentEventLog:
+    """
+    Deployment events are committed to a local SQLite (WAL) outbox first, then a
+    background thread ships them to DynamoDB with batch_writer. Events survive
+    DynamoDB outages and restarts; unsent rows are retried on the next flush.
+    """
+
+    def __init__(self, table_name: str, region_name: str, outbox_path: str = OUTBOX_PATH, table=None):
+        self.table_name = table_name
+        self.region_name = region_name
+        self._table = table
+        self._conn = sqlite3.connect(outbox_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS outbox (deployment_id TEXT PRIMARY KEY, item TEXT NOT NULL, created_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0);")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def table(self):
+        # One resource/table handle for the process, created on first flush
+        if self._table is None:
+            import boto3
+            dynamodb = boto3.resource("dynamodb", region_name=self.region_name, endpoint_url=DYNAMO_ENDPOINT_URL)
+            self._table = dynamodb.Table(self.table_name)
+        return self._table
+
+    def record(self, status: str, message: str, **fields) -> str:
+        deployment_id = new_deployment_id()
+        item = {"deployment_id": deployment_id, "timestamp": datetime.utcnow().isoformat(), "status": status, "message": message, **fields}
+        with self._lock:
+            self._conn.execute("INSERT INTO outbox (deployment_id, item, created_at) VALUES (?, ?, ?);", (deployment_id, json.dumps(item), time.time()))
+            self._conn.commit()
+        self._wake.set()
+        return deployment_id
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox;").fetchone()[0]
+
+    def flush(self) -> int:
+        """Sends everything queued in batches; returns how many events were delivered."""
+        sent = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT deployment_id, item FROM outbox ORDER BY created_at LIMIT ?;", (FLUSH_BATCH_SIZE,)).fetchall()
+            if not rows:
+                return sent
+            ids = [r[0] for r in rows]
+            try:
+                with span("dynamodb.flush", events=len(ids)):
+                    with self.table.batch_writer(overwrite_by_pkeys=["deployment_id"]) as writer:
+                        for _, item in rows:
+                            writer.put_item(Item=json.loads(item))
+            except Exception as e:
+                DYNAMO_EVENTS.labels("failed").inc(len(ids))
+                with self._lock:
+                    self._conn.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE deployment_id = ?;", [(i,) for i in ids])
+                    self._conn.commit()
+                print(f"⚠️  DynamoDB flush failed, {len(ids)} event(s) kept in outbox: {e}")
+                return sent
+            with self._lock:
+                self._conn.executemany("DELETE FROM outbox WHERE deployment_id = ?;", [(i,) for i in ids])
+                self._conn.commit()
+            sent += len(ids)
+            DYNAMO_EVENTS.labels("sent").inc(len(ids))
+            print(f"🗂️  Logged {len(ids)} deployment event(s) to DynamoDB.")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="deployment-event-log", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        backoff = FLUSH_INTERVAL_SECONDS
+        while not self._stop.is_set():
+            self._wake.wait(backoff)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            # Let a burst of events accumulate into one batch
+            time.sleep(0.05)
+            before = self.pending()
+            self.flush()
+            # Back off (up to a minute) while DynamoDB is unreachable
+            backoff = min(backoff * 2, 60) if before and self.pending() >= before else FLUSH_INTERVAL_SECONDS
+
+_event_logs: Dict[tuple, DeploymentEventLog] = {}
+_event_logs_lock = threading.Lock()
+
+def get_event_log(table_name: str, region_name: str) -> DeploymentEventLog:
+    """Process-wide log per table, flushing in the background until exit."""
+    key = (table_name, region_name)
+    with _event_logs_lock:
+        if key not in _event_logs:
+            log = DeploymentEventLog(table_name, region_name)
+            log.start()
+            atexit.register(log.stop)
+            _event_logs[key] = log
+        return _event_logs[key]
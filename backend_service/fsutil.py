@@ -0,0 +1,45 @@
+import os
+import json
+import uuid
+import hashlib
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Per-directory record of published media renditions (images and audio)
+VARIANTS_NAME = ".variants.json"
+
+# ---------- ATOMIC WRITES ----------
+def write_atomic(path: Path, text: str) -> Tuple[str, int]:
+    """Temp file + rename in the target directory; readers never see a half-written file."""
+    body = text.encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per write: the same file may be written twice concurrently
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, path)
+    return hashlib.sha256(body).hexdigest(), len(body)
+
+def write_json_atomic(path: Path, data, compact: bool = False):
+    text = json.dumps(data, separators=(",", ":")) if compact else json.dumps(data, indent=1, sort_keys=True)
+    write_atomic(path, text)
+
+def load_json(path: Path) -> dict:
+    """A state file written by write_json_atomic; missing or unreadable means empty."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ---------- VARIANTS ----------
+def load_variants(out_dir: Path) -> Dict[str, dict]:
+    return load_json(out_dir / VARIANTS_NAME)
+
+def save_variants(out_dir: Path, variants: Dict[str, dict]):
+    write_json_atomic(out_dir / VARIANTS_NAME, variants)
@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageOps, features
+
+from fsutil import file_sha256, load_variants, save_variants
+from process_pool import get_process_pool
+
+# ---------- CONFIG ----------
+# Responsive widths; sources narrower than a width are never upscaled
+IMAGE_WIDTHS = tuple(sorted(int(w) for w in os.environ.get("IMAGE_WIDTHS", "480,960,1600").split(",")))
+WEBP_QUALITY = int(os.environ.get("IMAGE_WEBP_QUALITY", 80))
+AVIF_QUALITY = int(os.environ.get("IMAGE_AVIF_QUALITY", 55))
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", os.cpu_count() or 2))
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tiff"}
+
+# Pillow >= 11.2 ships the AVIF plugin; older builds fall back to WebP only
+AVIF_AVAILABLE = "avif" in features.modules and bool(features.check_module("avif"))
+IMAGE_FORMATS = ("avif", "webp") if AVIF_AVAILABLE else ("webp",)
+
+def _settings() -> str:
+    # Variants built with other widths/qualities/formats are rebuilt
+    return f"{IMAGE_WIDTHS}|{WEBP_QUALITY}|{AVIF_QUALITY}|{IMAGE_FORMATS}"
+
+# ---------- TRANSCODE ----------
+def variant_name(img_id: str, width: int, fmt: str) -> str:
+    return f"{img_id}-{width}.{fmt}"
+
+def transcode(src: str, out_dir: str, img_id: str) -> Dict[str, object]:
+    """
+    Writes every width × format variant of one image. Runs in a worker process.
+    Nothing is copied from the source (EXIF, ICC, XMP): only pixels are saved.
+    """
+    out = Path(out_dir)
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info else "RGB")
+
+    widths = sorted({w for w in IMAGE_WIDTHS if w < im.width} | {min(im.width, IMAGE_WIDTHS[-1])})
+    for width in widths:
+        height = max(1, round(im.height * width / im.width))
+        resized = im if width == im.width else im.resize((width, height), Image.LANCZOS)
+        for fmt in IMAGE_FORMATS:
+            path = out / variant_name(img_id, width, fmt)
+            tmp = path.with_name(f".{path.name}.tmp")
+            if fmt == "webp":
+                resized.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            else:
+                resized.save(tmp, "AVIF", quality=AVIF_QUALITY)
+            os.replace(tmp, path)
+
+    return {
+        "width": widths[-1],
+        "height": max(1, round(im.height * widths[-1] / im.width)),
+        "widths": widths,
+        "formats": list(IMAGE_FORMATS),
+    }
+
+# ---------- PIPELINE ----------
+def _files(img_id: str, meta: dict):
+    return {variant_name(img_id, w, fmt) for w in meta["widths"] for fmt in meta["formats"]}
+
+def optimize_images(src_dir: Path, out_dir: Path) -> Dict[str, dict]:
+    """
+    Transcodes every source image in src_dir into responsive variants in out_dir.
+    Images whose source sha256 (and pipeline settings) match the last run are
+    skipped. Returns img_id → {"width", "height", "widths", "formats", "sha256"}.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    variants = load_variants(out_dir)
+    pending = {}
+    for src in sorted(src_dir.glob("*")) if src_dir.exists() else []:
+        if src.suffix.lower() not in SOURCE_SUFFIXES:
+            continue
+        img_id, sha256 = src.stem, file_sha256(src)
+        known = variants.get(img_id)
+        if (known and known["sha256"] == sha256 and known.get("settings") == _settings()
+                and all((out_dir / name).exists() for name in _files(img_id, known))):
+            continue
+        pending[img_id] = (src, sha256)
+
+    if pending:
+        pool = get_process_pool("images", IMAGE_WORKERS)
+        futures = {img_id: pool.submit(transcode, str(src), str(out_dir), img_id) for img_id, (src, _) in pending.items()}
+        for img_id, future in futures.items():
+            try:
+                meta = future.result()
+            except Exception as e:
+                print(f"⚠️  Could not transcode image '{img_id}': {e!r}")
+                continue
+            previous = variants.get(img_id)
+            meta.update(sha256=pending[img_id][1], settings=_settings())
+            if previous:
+                for stale in _files(img_id, previous) - _files(img_id, meta):
+                    (out_dir / stale).unlink(missing_ok=True)
+            variants[img_id] = meta
+        save_variants(out_dir, variants)
+        print(f"🖼️ Transcoded {len(pending)} image(s) → {', '.join(IMAGE_FORMATS)}")
+    return variants
@@ -0,0 +1,159 @@
+import os
+import shutil
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+
+import ijson
+
+from fsutil import write_atomic
+from placeholders import scan_page
+from workspaces import safe_join, UnsafePath
+
+# ---------- CONFIG ----------
+# Page writes in flight per request; also bounds how many page bodies are held in memory
+BOOTSTRAP_WRITE_CONCURRENCY = int(os.environ.get("BOOTSTRAP_WRITE_CONCURRENCY", 8))
+_SCALAR_EVENTS = {"null", "boolean", "integer", "double", "number", "string"}
+
+class MalformedPayload(Exception):
+    pass
+
+# ---------- STREAMING JSON ----------
+class _FieldAssembler:
+    """Turns ijson events into (key, value, is_item) for a top-level object."""
+
+    def __init__(self, streamed):
+        self.streamed = streamed
+        self.key = None
+        self._builder = None
+        self._depth = 0
+        self._is_item = False
+
+    def feed(self, events):
+        for prefix, event, value in events:
+            if self._builder is not None:
+                self._builder.event(event, value)
+                self._depth += event in ("start_map", "start_array")
+                self._depth -= event in ("end_map", "end_array")
+                if self._depth == 0:
+                    yield self.key, self._builder.value, self._is_item
+                    self._builder = None
+                continue
+            if prefix == "":
+                if event == "map_key":
+                    self.key = value
+                elif event not in ("start_map", "end_map"):
+                    raise MalformedPayload("Expected a JSON object")
+                continue
+            if self.key in self.streamed and prefix == self.key and event in ("start_array", "end_array"):
+                continue
+            self._is_item = prefix != self.key
+            if event in _SCALAR_EVENTS:
+                yield self.key, value, self._is_item
+                continue
+            self._builder, self._depth = ijson.ObjectBuilder(), 1
+            self._builder.event(event, value)
+
+async def iter_fields(stream, streamed=("pages", "assets")) -> AsyncIterator[Tuple[str, object, bool]]:
+    """
+    Parses a top-level JSON object from an async byte stream (request.stream())
+    incrementally and yields (key, value, is_item): each element of an array under
+    a `streamed` key as soon as it is complete, every other top-level value whole.
+    Chunks are pushed into ijson, so at most one element is assembled at a time.
+    """
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    fields = _FieldAssembler(streamed)
+    try:
+        async for chunk in stream:
+            if chunk:
+                parser.send(chunk)
+            for field in fields.feed(events):
+                yield field
+            del events[:]
+        parser.close()
+        for field in fields.feed(events):
+            yield field
+    except ijson.JSONError as e:
+        raise MalformedPayload(f"Invalid JSON: {str(e).splitlines()[0]}")
+
+# ---------- PAGE WRITES ----------
+def _write_page(site_dir: Path, filename: str, html: str):
+    sha256, size = write_atomic(site_dir / filename, html)
+    return {"filename": filename, "sha256": sha256, "bytes": size}, scan_page(html)
+
+def _write_asset(site_dir: Path, filename: str, content: str) -> bool:
+    # Names are content-hashed, so an existing file is already up to date
+    out_path = site_dir / filename
+    if out_path.exists():
+        return False
+    write_atomic(out_path, content)
+    return True
+
+class PageWriter:
+    """
+    Writes pages as they are parsed, on the default thread pool, with at most
+    `concurrency` writes in flight. The placeholder index and the page records
+    for the database are built in the same pass.
+    """
+
+    def __init__(self, site_dir: Path, concurrency: int = BOOTSTRAP_WRITE_CONCURRENCY):
+        self.site_dir = site_dir
+        self.pages: List[dict] = []
+        self.index: Dict[str, List[dict]] = {}
+        self.written = set()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+
+    async def _run(self, fn, *args):
+        try:
+            return await asyncio.to_thread(fn, self.site_dir, *args)
+        finally:
+            self._slots.release()
+
+    async def _page(self, filename: str, html: str):
+        record, markers = await self._run(_write_page, filename, html)
+        self.pages.append(record)
+        self.written.add(filename)
+        if markers:
+            self.index[filename] = markers
+
+    async def _asset(self, filename: str, content: str):
+        if await self._run(_write_asset, filename, content):
+            self.written.add(filename)
+
+    def _check(self, filename, content):
+        # Names come from the request body: never let one reach outside this site
+        try:
+            safe_join(self.site_dir, filename)
+        except UnsafePath as e:
+            raise MalformedPayload(str(e))
+        if not isinstance(content, str):
+            raise MalformedPayload(f"Content of {filename!r} must be a string")
+
+    async def add_page(self, filename: str, html: str):
+        self._check(filename, html)
+        # Waits for a free slot, so a fast client cannot queue unbounded page bodies
+        await self._slots.acquire()
+        self._tasks.append(asyncio.create_task(self._page(filename, html)))
+
+    async def add_asset(self, filename: str, content: str):
+        self._check(filename, content)
+        await self._slots.acquire()
+        self._tasks.append(asyncio.create_task(self._asset(filename, content)))
+
+    async def finish(self, raise_errors: bool = True):
+        """Waits for every write; re-raises the first failure unless raise_errors is False."""
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for result in results:
+            if raise_errors and isinstance(result, BaseException):
+                raise result
+
+    def move_to(self, site_dir: Path):
+        """Moves everything written so far into another site directory (e.g. a site_id sent after the pages)."""
+        for filename in self.written:
+            dst = safe_join(site_dir, filename)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(self.site_dir / filename), str(dst))
+        self.site_dir = site_dir
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from typing import Callable, Dict, Optional
+
+from db import execute, migrate
+from telemetry import span, request_id_var, site_id_var, JOBS
+
+# ---------- CONFIG ----------
+DEPLOY_WORKERS = int(os.environ.get("DEPLOY_WORKERS", 2))
+
+JOB_COLUMNS = ["id", "kind", "site_id", "status", "result", "error", "created_at", "started_at", "finished_at"]
+
+# ---------- PERSISTENCE ----------
+def get_job(job_id: str) -> Optional[Dict]:
+    rows = execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?;", (job_id,))
+    if not rows:
+        return None
+    job = dict(zip(JOB_COLUMNS, rows[0]))
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+def active_site_ids() -> set:
+    """Sites with a queued or running job (never garbage collected)."""
+    return {row[0] for row in execute("SELECT DISTINCT site_id FROM jobs WHERE status IN ('queued', 'running');")}
+
+# ---------- QUEUE ----------
+class JobQueue:
+    """
+    In-process queue with a pool of asyncio workers; job state lives in SQLite (db.py).
+    Handlers are sync functions (run on a thread) or coroutine functions.
+    A queued job that has not started yet absorbs later requests for the same
+    site and kind, and jobs for one site never run concurrently.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[str], dict]], workers: int = DEPLOY_WORKERS):
+        self.handlers = handlers
+        self.workers = workers
+        self._queue = None
+        self._tasks = []
+        self._pending = {}  # (kind, site_id) -> queued job id
+        self._site_locks = {}
+        self._enqueue_locks = {}
+
+    async def start(self):
+        await asyncio.to_thread(migrate)
+        self._queue = asyncio.Queue()
+        # Resume work interrupted by a restart
+        for job_id, kind, site_id in await asyncio.to_thread(self._requeue_interrupted):
+            self._pending.setdefault((kind, site_id), job_id)
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"🧵 Job queue started with {self.workers} worker(s)")
+
+    @staticmethod
+    def _requeue_interrupted():
+        rows = execute("SELECT id, kind, site_id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at;")
+        for job_id, _, _ in rows:
+            execute("UPDATE jobs SET status = 'queued' WHERE id = ?;", (job_id,))
+        return rows
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not all(t.done() for t in self._tasks)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, kind: str, site_id: str) -> str:
+        # Check + insert under one lock per (kind, site) so concurrent requests coalesce
+        # even while the insert is off the event loop
+        async with self._enqueue_locks.setdefault((kind, site_id), asyncio.Lock()):
+            pending = self._pending.get((kind, site_id))
+            if pending:
+                print(f"🔗 Coalesced {kind} for site '{site_id}' into job {pending}")
+                return pending
+
+            job_id = uuid.uuid4().hex
+            # SQLite waits up to BUSY_TIMEOUT_SECONDS on a lock: keep it off the event loop
+            await asyncio.to_thread(
+                execute,
+                "INSERT INTO jobs (id, kind, site_id, status, created_at) VALUES (?, ?, ?, 'queued', ?);",
+                (job_id, kind, site_id, time.time()),
+            )
+            self._pending[(kind, site_id)] = job_id
+            self._queue.put_nowait(job_id)
+            return job_id
+
+    async def _worker(self, n: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await asyncio.to_thread(get_job, job_id)
+        if job is None or job["status"] != "queued":
+            return
+        lock = self._site_locks.setdefault(job["site_id"], asyncio.Lock())
+        # Job logs carry the job id as their request id
+        request_id_var.set(job_id)
+        site_id_var.set(job["site_id"])
+        async with lock:
+            # From here on a new request for this site needs a fresh job
+            self._pending.pop((job["kind"], job["site_id"]), None)
+            await asyncio.to_thread(execute, "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?;", (time.time(), job_id))
+            print(f"⚙️ Job {job_id} ({job['kind']} {job['site_id']}) started")
+            try:
+                with span(f"job.{job['kind']}", job_id=job_id):
+                    handler = self.handlers[job["kind"]]
+                    if asyncio.iscoroutinefunction(handler):
+                        result = await handler(job["site_id"])
+                    else:
+                        result = await asyncio.to_thread(handler, job["site_id"])
+                await asyncio.to_thread(
+                    execute,
+                    "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE id = ?;",
+                    (json.dumps(result, default=str), time.time(), job_id),
+                )
+                JOBS.labels(job["kind"], "succeeded").inc()
+                print(f"✅ Job {job_id} succeeded")
+            except Exception as e:
+                await asyncio.to_thread(
+                    execute,
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?;",
+                    (repr(e), time.time(), job_id),
+                )
+                JOBS.labels(job["kind"], "failed").inc()
+                print(f"❌ Job {job_id} failed: {e!r}")
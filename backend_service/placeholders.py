@@ -0,0 +1,122 @@
+import re
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fsutil import write_atomic, write_json_atomic
+
+# ---------- PLACEHOLDER INDEX ----------
+# Which page holds which IMAGE_PLACEHOLDER / VOICE_PLACEHOLDER marker and where.
+# Built at /bootstrap time so /submit-assets only opens pages it will change.
+INDEX_NAME = ".placeholders.json"
+PLACEHOLDER_RE = re.compile(r"<!-- (?:IMAGE_PLACEHOLDER:([\w-]+)|(VOICE_PLACEHOLDER)) -->")
+
+# The voice button always plays the `site_intro` track
+VOICE_ID = "site_intro"
+VOICE_BUTTON = "<button class='voice-btn' onclick=\"document.getElementById('audio_site_intro').play()\">🔊 Listen</button>"
+# Legacy sites that only have the uploaded mp3
+LEGACY_VOICE = {"files": [["site_intro.mp3", "audio/mpeg"]]}
+
+def voice_tag(voice: dict) -> str:
+    """Nothing is fetched until the visitor presses play; the browser picks the first playable source."""
+    sources = "".join(f"<source src='assets/audio/{name}' type='{mime}'>" for name, mime in voice["files"])
+    return f"{VOICE_BUTTON}\n<audio id='audio_site_intro' preload='none'>{sources}</audio>"
+
+# Above-the-fold images load eagerly; lazy-loading the hero would delay LCP
+EAGER_IMAGE_IDS = {"home_hero"}
+HERO_SIZES = "100vw"
+SECTION_SIZES = "(max-width: 1100px) 65vw, 620px"
+
+def _srcset(img_id: str, meta: dict, fmt: str) -> str:
+    return ", ".join(f"assets/images/{img_id}-{w}.{fmt} {w}w" for w in meta["widths"])
+
+def image_tag(img_id: str, meta: Optional[dict] = None) -> str:
+    """
+    <picture> with AVIF/WebP srcsets for transcoded images (meta from images.optimize_images);
+    a plain <img> for legacy sites that only have the original PNG.
+    """
+    if not meta:
+        return f"<img src='assets/images/{img_id}.png' class='section-image'/>"
+    sizes = HERO_SIZES if img_id in EAGER_IMAGE_IDS else SECTION_SIZES
+    loading = "loading='eager' fetchpriority='high'" if img_id in EAGER_IMAGE_IDS else "loading='lazy'"
+    fallback = min(meta["widths"], key=lambda w: abs(w - 960))
+    sources = "".join(
+        f"<source type='image/{fmt}' srcset='{_srcset(img_id, meta, fmt)}' sizes='{sizes}'>"
+        for fmt in meta["formats"] if fmt != "webp"
+    )
+    return (
+        f"<picture>{sources}<img src='assets/images/{img_id}-{fallback}.webp' srcset='{_srcset(img_id, meta, 'webp')}' "
+        f"sizes='{sizes}' width='{meta['width']}' height='{meta['height']}' {loading} decoding='async' alt='' "
+        f"class='section-image'/></picture>"
+    )
+
+def scan_page(html: str) -> List[dict]:
+    """Markers in document order: {"id": image id or None for voice, "start", "end"}."""
+    return [{"id": m.group(1), "start": m.start(), "end": m.end()} for m in PLACEHOLDER_RE.finditer(html)]
+
+def build_index(pages: Dict[str, str]) -> Dict[str, List[dict]]:
+    """filename → markers; pages without markers are left out."""
+    index = {}
+    for filename, html in pages.items():
+        markers = scan_page(html)
+        if markers:
+            index[filename] = markers
+    return index
+
+def load_index(site_dir: Path) -> Dict[str, List[dict]]:
+    path = site_dir / INDEX_NAME
+    if not path.exists():
+        # Site written before the index existed: scan it once
+        index = build_index({p.name: p.read_text(encoding="utf-8") for p in site_dir.glob("*.html")})
+        save_index(site_dir, index)
+        return index
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def save_index(site_dir: Path, index: Dict[str, List[dict]]):
+    write_json_atomic(site_dir / INDEX_NAME, index, compact=True)
+
+# ---------- INJECTION ----------
+def _replacement(marker_id, images: Dict[str, Optional[dict]], voice: Optional[dict]):
+    if marker_id is None:
+        return voice_tag(voice) if voice else None
+    return image_tag(marker_id, images[marker_id]) if marker_id in images else None
+
+def render_page(html: str, markers: List[dict], images: Dict[str, Optional[dict]], voice: Optional[dict]) -> str:
+    """
+    Splices every fillable marker in one pass using the indexed offsets.
+    Falls back to a single regex pass if the page drifted from its index.
+    """
+    pieces, last = [], 0
+    for m in markers:
+        marker = html[m["start"]:m["end"]]
+        match = PLACEHOLDER_RE.fullmatch(marker)
+        if match is None or match.group(1) != m["id"]:
+            return PLACEHOLDER_RE.sub(lambda x: _replacement(x.group(1), images, voice) or x.group(0), html)
+        pieces.append(html[last:m["start"]])
+        pieces.append(_replacement(m["id"], images, voice) or marker)
+        last = m["end"]
+    pieces.append(html[last:])
+    return "".join(pieces)
+
+def inject_assets(site_dir: Path, images: Dict[str, Optional[dict]], voice: Optional[dict]) -> List[str]:
+    """
+    Fills placeholders for the available images (id → variant metadata, None for
+    a legacy PNG) / voice track (audio.optimize_audio metadata, None if missing).
+    Only pages with at least one fillable marker are read and rewritten.
+    Returns the rewritten filenames.
+    """
+    index = load_index(site_dir)
+    rewritten = []
+    for filename, markers in index.items():
+        if not any(_replacement(m["id"], images, voice) for m in markers):
+            continue
+        path = site_dir / filename
+        html = path.read_text(encoding="utf-8")
+        new_html = render_page(html, markers, images, voice)
+        if new_html != html:
+            write_atomic(path, new_html)
+            rewritten.append(filename)
+        index[filename] = scan_page(new_html)
+
+    save_index(site_dir, {k: v for k, v in index.items() if v})
+    return rewritten
@@ -0,0 +1,30 @@
+import os
+import threading
+import multiprocessing
+from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+
+# ---------- CONFIG ----------
+# The server is threaded (event loop, to_thread workers, S3 transfer threads): fork()
+# can copy a lock another thread holds into a worker and hang it, so workers start
+# from a clean interpreter instead
+POOL_START_METHOD = os.environ.get("POOL_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# ---------- POOLS ----------
+_pools: Dict[str, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def get_process_pool(name: str, max_workers: int) -> ProcessPoolExecutor:
+    """One long-lived pool per workload (image transcodes, builds), started on first use."""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return _pools[name]
+
+def shutdown_process_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,225 @@
+import os
+import json
+import uuid
+import fnmatch
+import contextvars
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from fsutil import write_json_atomic
+from telemetry import span, DEPLOY_OBJECTS
+
+# ---------- CONFIG ----------
+UPLOAD_WORKERS = int(os.environ.get("DEPLOY_UPLOAD_WORKERS", 16))
+# Above this many changed paths a single wildcard invalidation is cheaper
+MAX_INVALIDATION_PATHS = int(os.environ.get("DEPLOY_MAX_INVALIDATION_PATHS", 50))
+# Keep single-part uploads for site-sized files so S3 ETags stay plain MD5s
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+
+HASHED_ASSET_PATTERN = "assets/styles.*.css"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HTML_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+ASSET_CACHE_CONTROL = "public, max-age=86400"
+# Sidecars written by compress.build_dist: ".gz" becomes the body of its source
+# key, ".br" is uploaded as its own key for edge Accept-Encoding rewrites
+PRECOMPRESSED = {".gz": "gzip", ".br": "br"}
+
+# ---------- CLIENTS ----------
+# boto3 is imported on first use, so importing this module (server startup) stays cheap
+_clients = {}
+# boto3's default session is not safe for concurrent client creation
+_clients_lock = threading.Lock()
+
+def get_client(service: str, region_name: str = None):
+    """One pooled client per service, shared by every upload thread."""
+    key = (service, region_name)
+    with _clients_lock:
+        if key not in _clients:
+            import boto3
+            from botocore.config import Config
+            _clients[key] = boto3.client(
+                service,
+                region_name=region_name,
+                config=Config(max_pool_connections=UPLOAD_WORKERS * 2, retries={"max_attempts": 5, "mode": "adaptive"}),
+            )
+        return _clients[key]
+
+@lru_cache(maxsize=1)
+def transfer_config():
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(multipart_threshold=MULTIPART_THRESHOLD, max_concurrency=4, use_threads=True)
+
+# ---------- OBJECT METADATA ----------
+def content_type_for(key: str) -> str:
+    if key.endswith(".html"):
+        return "text/html; charset=utf-8"
+    if key.endswith(".css"):
+        return "text/css; charset=utf-8"
+    if key.endswith(".avif"):
+        return "image/avif"
+    if key.endswith(".webm"):
+        return "audio/webm"
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+def is_hashed_asset(key: str) -> bool:
+    return fnmatch.fnmatch(key, HASHED_ASSET_PATTERN) or fnmatch.fnmatch(key, HASHED_ASSET_PATTERN + ".br")
+
+def cache_control_for(key: str) -> str:
+    if is_hashed_asset(key):
+        return IMMUTABLE_CACHE_CONTROL
+    if key.endswith(".html"):
+        return HTML_CACHE_CONTROL
+    return ASSET_CACHE_CONTROL
+
+# ---------- MANIFEST ----------
+def file_md5(path: Path) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def site_objects(site_dir: Path) -> Dict[str, Tuple[Path, Optional[str]]]:
+    """
+    Maps every deployable key (relative POSIX path) to the file uploaded for it and
+    its Content-Encoding; dotfiles are skipped. A "<key>.gz" sidecar replaces the
+    body of <key>, a "<key>.br" sidecar stays a separate br-encoded object.
+    """
+    files = {}
+    for path in sorted(site_dir.rglob("*")):
+        rel = path.relative_to(site_dir)
+        if path.is_file() and not any(part.startswith(".") for part in rel.parts):
+            files[rel.as_posix()] = path
+
+    objects = {}
+    for key, path in files.items():
+        base, ext = os.path.splitext(key)
+        if ext == ".gz" and base in files:
+            continue
+        encoding = PRECOMPRESSED[ext] if ext in PRECOMPRESSED and base in files else None
+        if key + ".gz" in files:
+            path, encoding = files[key + ".gz"], "gzip"
+        objects[key] = (path, encoding)
+    return objects
+
+def scan_site(site_dir: Path) -> Dict[str, str]:
+    """Maps every deployable key to the MD5 of the body uploaded for it."""
+    return {key: file_md5(path) for key, (path, _) in site_objects(site_dir).items()}
+
+def load_manifest(path: Path) -> Optional[Dict[str, str]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+def save_manifest(path: Path, manifest: Dict[str, str]):
+    write_json_atomic(path, manifest)
+
+def _excluded(key: str, exclude: Tuple[str, ...]) -> bool:
+    return any(key.startswith(p) for p in exclude)
+
+def remote_manifest(s3, bucket: str, prefix: str = "", exclude: Tuple[str, ...] = ()) -> Dict[str, str]:
+    """
+    Seeds a manifest from the bucket's ETags (MD5 for single-part uploads).
+    Keys under `exclude` (relative to prefix) belong to someone else and are skipped.
+    """
+    manifest = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"][len(prefix):]
+            if not _excluded(key, exclude):
+                manifest[key] = obj["ETag"].strip('"')
+    return manifest
+
+def plan_deploy(local: Dict[str, str], previous: Dict[str, str], exclude: Tuple[str, ...] = ()):
+    changed = [k for k, md5 in local.items() if previous.get(k) != md5]
+    # Never delete outside this site's own namespace, even if an old manifest lists such keys
+    deleted = [k for k in previous if k not in local and not is_hashed_asset(k) and not _excluded(k, exclude)]
+    return changed, deleted
+
+# ---------- CLOUDFRONT ----------
+def invalidation_paths(keys: List[str], prefix: str = "") -> List[str]:
+    paths = set()
+    for key in keys:
+        paths.add(f"/{prefix}{key}")
+        if key == "index.html" or key.endswith("/index.html"):
+            paths.add(f"/{prefix}{key[:-len('index.html')]}")
+    if len(paths) > MAX_INVALIDATION_PATHS:
+        return [f"/{prefix}*"]
+    return sorted(paths)
+
+def invalidate(cloudfront, distribution_id: str, paths: List[str]) -> Optional[str]:
+    if not paths:
+        return None
+    resp = cloudfront.create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={"Paths": {"Quantity": len(paths), "Items": paths}, "CallerReference": uuid.uuid4().hex},
+    )
+    return resp["Invalidation"]["Id"]
+
+# ---------- DEPLOY ----------
+def _upload(s3, bucket: str, prefix: str, key: str, path: Path, encoding: Optional[str]):
+    # Metadata follows the uncompressed source ("index.html.br" is still text/html)
+    source = key[:-3] if encoding == "br" else key
+    extra = {"ContentType": content_type_for(source), "CacheControl": cache_control_for(source)}
+    if encoding:
+        extra["ContentEncoding"] = encoding
+    with span("s3.put_object", key=key):
+        s3.upload_file(str(path), bucket, prefix + key, ExtraArgs=extra, Config=transfer_config())
+
+def deploy_site(site_dir: Path, bucket: str, distribution_id: Optional[str], manifest_path: Path,
+                prefix: str = "", s3=None, cloudfront=None, exclude: Tuple[str, ...] = ()) -> Dict[str, object]:
+    """
+    Uploads only files whose MD5 differs from the last deployed manifest, deletes
+    removed ones and invalidates just the touched paths. Keys under `exclude`
+    (e.g. other sites' "sites/" when deploying to the bucket root) are left alone.
+    Clients may be injected (e.g. moto-backed) for local testing.
+    """
+    s3 = s3 or get_client("s3")
+    previous = load_manifest(manifest_path)
+    if previous is None:
+        previous = remote_manifest(s3, bucket, prefix, exclude)
+    previous = {k: v for k, v in previous.items() if not _excluded(k, exclude)}
+
+    with span("s3.plan"):
+        objects = site_objects(site_dir)
+        local = {key: file_md5(path) for key, (path, _) in objects.items()}
+        changed, deleted = plan_deploy(local, previous, exclude)
+
+    with span("s3.upload", objects=len(changed)):
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+            # Each upload runs in a copy of this context so its span keeps the site/job ids
+            futures = [pool.submit(contextvars.copy_context().run, _upload, s3, bucket, prefix, key, *objects[key]) for key in changed]
+            for future in futures:
+                future.result()
+
+    with span("s3.delete", objects=len(deleted)):
+        for i in range(0, len(deleted), 1000):
+            batch = deleted[i:i + 1000]
+            s3.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": prefix + k} for k in batch], "Quiet": True})
+    DEPLOY_OBJECTS.labels("uploaded").inc(len(changed))
+    DEPLOY_OBJECTS.labels("deleted").inc(len(deleted))
+    DEPLOY_OBJECTS.labels("unchanged").inc(len(local) - len(changed))
+
+    # Hashed assets that are no longer local stay remote; keep tracking them
+    kept = {k: v for k, v in previous.items() if k not in local and k not in deleted}
+    save_manifest(manifest_path, {**kept, **local})
+
+    invalidation_id = None
+    touched = [k for k in changed if not is_hashed_asset(k)] + deleted
+    if distribution_id and touched:
+        paths = invalidation_paths(touched, prefix)
+        with span("cloudfront.invalidate", paths=len(paths)):
+            invalidation_id = invalidate(cloudfront or get_client("cloudfront"), distribution_id, paths)
+
+    return {
+        "uploaded": changed,
+        "deleted": deleted,
+        "unchanged": len(local) - len(changed),
+        "invalidation_id": invalidation_id,
+    }
@@ -1,17 +1,37 @@
 import os
-import requests
-import subprocess
-from fastapi import FastAPI, Request, UploadFile, File, Form
+import shutil
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+from downloader import download_all, close_http_client
+from process_pool import shutdown_process_pools
+from uploads import save_multipart, discard, UploadTooLarge, MalformedUpload
+from ingest import iter_fields, PageWriter, MalformedPayload
+from placeholders import save_index
+from jobs import JobQueue, get_job, active_site_ids
+from db import upsert_site, record_pages, record_assets
+from workspaces import Workspace, create_workspace, get_workspace, gc_workspaces, valid_site_id, safe_join, UnsafePath
+import deploy
+import telemetry
+from telemetry import span, site_id_var, log_event
 
 BASE_DIR = Path(__file__).resolve().parent
-SITE_DIR = BASE_DIR / "static_site"
-IMG_DIR = SITE_DIR / "assets" / "images"
-AUDIO_DIR = SITE_DIR / "assets" / "audio"
+WORKSPACE_GC_INTERVAL_SECONDS = float(os.environ.get("WORKSPACE_GC_INTERVAL_SECONDS", 3600))
+# Multipart uploads land here before the target workspace is known
+UPLOAD_STAGING_DIR = BASE_DIR / "data" / "uploads"
 
 app = FastAPI()
 
+# X-Request-ID propagation, request latency histograms and GET /metrics
+telemetry.install(app)
+
+# Media transcoding, placeholder injection and deploys run in-process on
+# background workers, off the request path
+job_queue = JobQueue({"deploy": deploy.publish})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -19,96 +39,200 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def write_page(filename: str, html_content: str):
-    SITE_DIR.mkdir(parents=True, exist_ok=True)
-    (SITE_DIR / filename).write_text(html_content, encoding="utf-8")
-
-def download(url: str, out_path: Path):
-    print(f"📥 Downloading → {url}")
-    r = requests.get(url, stream=True)
-    if r.status_code == 200:
-        with open(out_path, "wb") as f:
-            f.write(r.content)
-        print(f"✅ Saved → {out_path}")
-    else:
-        print(f"⚠️ Failed → {url}")
+def with_site_id(url: str, site_id: str) -> str:
+    # The media agent posts assets back to this URL, so it carries the site id
+    if not url:
+        return url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "site_id"] + [("site_id", site_id)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
 
 @app.post("/bootstrap")
 async def bootstrap(request: Request):
-    data = await request.json()
-
-    pages = data["pages"]
-    images_needed = data["images_needed"]
-    voices_needed = data["voice_scripts_needed"]
-    callback_url = data.get("callback_url_for_assets")
-
-    for page in pages:
-        write_page(page["filename"], page["html_file"])
-
+    # ✅ The body is parsed as it streams in: each page is written (and scanned for
+    #    placeholders) as soon as it is complete, so memory stays flat for any site size
+    fields, ws, writer, staged = {}, None, None, None
+
+    def _open_workspace(site_id):
+        nonlocal ws, writer, staged
+        # Pages for an existing site are staged in a new workspace and only moved over once
+        # the whole body is in, so a failed re-bootstrap leaves the live site as it was
+        ws = create_workspace(site_id if site_id and get_workspace(site_id) is None else None)
+        staged = ws.root
+        site_id_var.set(ws.site_id)
+        writer = PageWriter(ws.site_dir)
+
+    try:
+        with span("write.pages"):
+            async for key, value, is_item in iter_fields(request.stream()):
+                if key == "site_id" and value is not None and not valid_site_id(value):
+                    raise MalformedPayload("Invalid site_id")
+                if key in ("pages", "assets"):
+                    if not is_item:
+                        raise MalformedPayload(f"'{key}' must be an array")
+                    if writer is None:
+                        _open_workspace(fields.get("site_id"))
+                    if key == "pages":
+                        await writer.add_page(value["filename"], value["html_file"])
+                    else:
+                        await writer.add_asset(value["filename"], value["content"])
+                else:
+                    fields[key] = value
+            if writer is None:
+                _open_workspace(fields.get("site_id"))
+            await writer.finish()
+
+            # Staged (or site_id sent after the pages): move them into the target site
+            site_id = fields.get("site_id")
+            if site_id and site_id != ws.site_id:
+                ws = create_workspace(site_id)
+                site_id_var.set(ws.site_id)
+                await asyncio.to_thread(writer.move_to, ws.site_dir)
+                await asyncio.to_thread(shutil.rmtree, staged, True)
+            staged = None
+    except (MalformedPayload, KeyError, TypeError) as e:
+        if writer is not None:
+            await writer.finish(raise_errors=False)
+        if staged is not None:
+            await asyncio.to_thread(shutil.rmtree, staged, True)
+        detail = str(e) if isinstance(e, MalformedPayload) else f"Malformed page or asset entry: {e!r}"
+        raise HTTPException(status_code=400, detail=detail)
+
+    # ✅ Record where each page's placeholders are (only these pages get injected later)
+    with span("index.placeholders"):
+        save_index(ws.site_dir, writer.index)
+
+    # Pooled SQLite calls can wait on a lock (BUSY_TIMEOUT_SECONDS): never on the event loop
+    await asyncio.to_thread(upsert_site, ws.site_id, status="bootstrapped", s3_prefix=ws.s3_prefix,
+                            business_name=fields.get("business_name"), website_type=fields.get("website_type"))
+    await asyncio.to_thread(record_pages, ws.site_id, writer.pages)
+
+    log_event("site.bootstrapped", pages=len(writer.pages))
     return {
         "status": "site initialized",
-        "images_needed": images_needed,
-        "voice_scripts_needed": voices_needed,
-        "callback_url_for_assets": callback_url
+        "site_id": ws.site_id,
+        "images_needed": fields.get("images_needed", []),
+        "voice_scripts_needed": fields.get("voice_scripts_needed", []),
+        "callback_url_for_assets": with_site_id(fields.get("callback_url_for_assets"), ws.site_id)
     }
 
+def _workspace_or_404(site_id: str = None) -> Workspace:
+    # No site_id → the legacy shared static_site directory
+    ws = get_workspace(site_id)
+    if ws is None:
+        raise HTTPException(status_code=404, detail=f"Unknown site_id '{site_id}'")
+    site_id_var.set(ws.site_id)
+    ws.img_dir.mkdir(parents=True, exist_ok=True)
+    ws.img_src_dir.mkdir(parents=True, exist_ok=True)
+    ws.audio_dir.mkdir(parents=True, exist_ok=True)
+    ws.audio_src_dir.mkdir(parents=True, exist_ok=True)
+    return ws
+
+def _asset_path(ws: Workspace, path: Path) -> str:
+    # Deployed files relative to the site, image sources relative to the workspace
+    return str(path.relative_to(ws.site_dir) if ws.site_dir in path.parents else path.relative_to(ws.root))
+
 @app.post("/submit-assets")
 async def submit_assets(request: Request):
     content_type = request.headers.get("content-type", "")
 
-    IMG_DIR.mkdir(parents=True, exist_ok=True)
-    AUDIO_DIR.mkdir(parents=True, exist_ok=True)
-
     # ✅ CASE 1: JSON (URL based assets)
     if "application/json" in content_type:
         data = await request.json()
-
-        # Images
-        for img in data.get("images", []):
-            download(img["file_url"], IMG_DIR / f"{img['id']}.png")
-
-        # Voice (URL mp3)
-        for v in data.get("voices", []):
-            download(v["file_url"], AUDIO_DIR / f"{v['id']}.mp3")
-
-    # ✅ CASE 2: Multipart form-data (binary audio upload)
+        ws = _workspace_or_404(request.query_params.get("site_id") or data.get("site_id"))
+
+        # Images + voice (URL mp3), fetched concurrently; ids become file names, so keep them inside the site
+        try:
+            jobs = [(img["file_url"], safe_join(ws.img_src_dir, f"{img['id']}.png")) for img in data.get("images", [])]
+            jobs += [(v["file_url"], safe_join(ws.audio_src_dir, f"{v['id']}.mp3")) for v in data.get("voices", [])]
+        except UnsafePath as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        results = await download_all(jobs)
+        assets = [
+            {"path": _asset_path(ws, Path(r["path"])), "kind": Path(r["path"]).parent.name,
+             "sha256": r["sha256"], "bytes": Path(r["path"]).stat().st_size, "source_url": r["url"]}
+            for r in results if r["status"] in ("downloaded", "unchanged")
+        ]
+        await asyncio.to_thread(record_assets, ws.site_id, assets)
+
+    # ✅ CASE 2: Multipart form-data (binary audio upload), streamed to disk chunk by chunk
     elif "multipart/form-data" in content_type:
-        form = await request.form()
-        for key, file in form.items():
-            if hasattr(file, "filename"):
-                out_file = AUDIO_DIR / file.filename
-                with open(out_file, "wb") as f:
-                    f.write(await file.read())
-                print(f"✅ Uploaded Binary Voice File → {out_file}")
+        try:
+            fields, files = await save_multipart(request, UPLOAD_STAGING_DIR)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except MalformedUpload as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            ws = _workspace_or_404(request.query_params.get("site_id") or fields.get("site_id"))
+            for file in files:
+                out_file = ws.audio_src_dir / Path(file["filename"]).name
+                await asyncio.to_thread(shutil.move, file["path"], out_file)
+                print(f"✅ Uploaded Binary Voice File → {out_file} ({file['bytes']} bytes)")
+        finally:
+            discard(files)
     else:
         return {"error": "Unsupported input format. Send JSON or multipart."}
 
-    # ✅ Insert images into site pages (replace placeholders)
-    for html_file in SITE_DIR.glob("*.html"):
-        content = html_file.read_text()
-
-        for img_file in IMG_DIR.glob("*.png"):
-            img_id = img_file.stem
-            placeholder = f"<!-- IMAGE_PLACEHOLDER:{img_id} -->"
-            tag = f"<img src='assets/images/{img_id}.png' class='section-image'/>"
-            content = content.replace(placeholder, tag)
-
-        # Voice Button always plays `audio/site_intro.mp3`
-        if "site_intro.mp3" in [x.name for x in AUDIO_DIR.iterdir()]:
-            content = content.replace(
-                "<!-- VOICE_PLACEHOLDER -->",
-                "<button class='voice-btn' onclick=\"document.getElementById('audio_site_intro').play()\">🔊 Listen</button>\n<audio id='audio_site_intro' src='assets/audio/site_intro.mp3'></audio>"
-            )
-
-        html_file.write_text(content)
-
-    # ✅ Deploy to S3
-    print("🚀 Deploying website to S3...")
-    subprocess.call("python3 deploy.py", cwd=BASE_DIR, shell=True)
-    print("✅ Deployment complete! CloudFront updated 🎉")
-
-    return {"status": "assets injected + deployed ✅"}
+    # ✅ Queue transcode + inject + deploy (pending jobs for the site are coalesced)
+    ws.touch()
+    job_id = await job_queue.enqueue("deploy", ws.site_id)
+    print(f"🚀 Deployment queued → job {job_id}")
+    log_event("deploy.queued", job_id=job_id)
+
+    return {"status": "assets received + deploy queued ✅", "site_id": ws.site_id, "job_id": job_id}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+async def _gc_loop():
+    while True:
+        await asyncio.sleep(WORKSPACE_GC_INTERVAL_SECONDS)
+        try:
+            keep = await asyncio.to_thread(active_site_ids)
+            await asyncio.to_thread(gc_workspaces, keep=keep)
+        except Exception as e:
+            print(f"⚠️ Workspace GC failed: {e!r}")
+
+async def _warm_up():
+    # AWS SDK import + pooled clients, off the event loop, before the first deploy needs them
+    try:
+        await asyncio.to_thread(deploy.warm_clients)
+        app.state.warm = True
+        print("🔥 AWS clients ready")
+    except Exception as e:
+        app.state.warm_up_error = repr(e)
+        print(f"⚠️ AWS client warm-up failed: {e!r}")
+
+@app.on_event("startup")
+async def startup():
+    app.state.warm = False
+    app.state.warm_up_error = None
+    await job_queue.start()
+    app.state.gc_task = asyncio.create_task(_gc_loop())
+    app.state.warm_task = asyncio.create_task(_warm_up())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.gc_task.cancel()
+    app.state.warm_task.cancel()
+    await job_queue.stop()
+    await close_http_client()
+    shutdown_process_pools()
 
 @app.get("/health")
 async def health():
+    # Liveness: the process is serving; see /ready for traffic readiness
     return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    checks = {"job_queue": job_queue.running, "aws_clients": getattr(app.state, "warm", False)}
+    if all(checks.values()):
+        return {"status": "ready", **checks}
+    detail = {"status": "starting", **checks, "error": getattr(app.state, "warm_up_error", None)}
+    return JSONResponse(detail, status_code=503)
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    # get_pool() reopens (and migrates) whenever DB_PATH changes
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "site.db"))
+    yield db.DB_PATH
+    db.get_pool().close_all()
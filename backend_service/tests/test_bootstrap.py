@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+import server
+import workspaces
+
+def _client(tmp_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(workspaces, "WORKSPACES_DIR", tmp_path / "sites")
+    return TestClient(server.app)
+
+def _page(filename, html="<html><body>hi</body></html>"):
+    return {"filename": filename, "html_file": html}
+
+def test_filenames_outside_the_site_are_rejected(tmp_db, tmp_path, monkeypatch):
+    client = _client(tmp_db, tmp_path, monkeypatch)
+    for filename in ("../../escape.html", "/etc/escape.html", ""):
+        response = client.post("/bootstrap", json={"pages": [_page(filename)]})
+        assert response.status_code == 400, filename
+    assert not (tmp_path / "escape.html").exists()
+    assert not any((tmp_path / "sites").iterdir())
+
+def test_pages_must_be_an_array(tmp_db, tmp_path, monkeypatch):
+    client = _client(tmp_db, tmp_path, monkeypatch)
+    assert client.post("/bootstrap", json={"pages": 5}).status_code == 400
+    assert client.post("/bootstrap", json={"assets": {"filename": "a.css"}}).status_code == 400
+
+def test_failed_rebootstrap_leaves_the_live_site_untouched(tmp_db, tmp_path, monkeypatch):
+    client = _client(tmp_db, tmp_path, monkeypatch)
+    site_id = client.post("/bootstrap", json={"pages": [_page("index.html", "v1")]}).json()["site_id"]
+    index = workspaces.get_workspace(site_id).site_dir / "index.html"
+
+    response = client.post("/bootstrap", json={"site_id": site_id, "pages": [_page("index.html", "v2"), _page("../x.html")]})
+    assert response.status_code == 400
+    assert index.read_text() == "v1"
+    assert [p.name for p in (tmp_path / "sites").iterdir()] == [site_id]
+
+    response = client.post("/bootstrap", json={"site_id": site_id, "pages": [_page("index.html", "v2")]})
+    assert response.status_code == 200
+    assert index.read_text() == "v2"
+    assert [p.name for p in (tmp_path / "sites").iterdir()] == [site_id]
@@ -0,0 +1,29 @@
+import gzip
+
+import compress
+from process_pool import get_process_pool
+
+def _site(site_dir, count):
+    site_dir.mkdir()
+    for i in range(count):
+        (site_dir / f"page{i}.html").write_text(f"<html>  <body>\n  <p>page {i}</p>{' filler' * 200}</body></html>")
+
+def test_small_rebuilds_stay_inline(tmp_path, monkeypatch):
+    monkeypatch.setattr(compress, "get_process_pool", lambda *args: None)  # would fail if used
+    _site(tmp_path / "site", compress.BUILD_INLINE_MAX)
+
+    result = compress.build_dist(tmp_path / "site", tmp_path / "dist")
+
+    assert len(result["built"]) == compress.BUILD_INLINE_MAX
+    assert gzip.decompress((tmp_path / "dist/page0.html.gz").read_bytes()).startswith(b"<html><body><p>page 0</p>")
+
+def test_large_rebuilds_use_the_shared_non_fork_pool(tmp_path):
+    _site(tmp_path / "site", compress.BUILD_INLINE_MAX + 4)
+
+    result = compress.build_dist(tmp_path / "site", tmp_path / "dist", workers=2)
+
+    assert len(result["built"]) == compress.BUILD_INLINE_MAX + 4
+    assert (tmp_path / f"dist/page{compress.BUILD_INLINE_MAX + 3}.html.gz").exists()
+    pool = get_process_pool("build", 2)
+    assert pool._mp_context.get_start_method() != "fork"
+    assert compress.build_dist(tmp_path / "site", tmp_path / "dist", workers=2)["built"] == []
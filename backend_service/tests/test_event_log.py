@@ -0,0 +1,46 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from event_log import DeploymentEventLog
+
+class FailingTable:
+    def batch_writer(self, **kwargs):
+        raise ConnectionError("DynamoDB unreachable")
+
+@pytest.fixture
+def table(monkeypatch):
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(name, "testing")
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        yield dynamodb.create_table(
+            TableName="WebsiteDeployments",
+            KeySchema=[{"AttributeName": "deployment_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "deployment_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+def test_outbox_keeps_events_until_the_table_accepts_them(table, tmp_path):
+    log = DeploymentEventLog("WebsiteDeployments", "us-east-1", outbox_path=str(tmp_path / "outbox.db"), table=FailingTable())
+    ids = [log.record("SUCCESS", f"deploy {i}", site_id="s1") for i in range(3)]
+
+    assert log.flush() == 0
+    assert log.pending() == 3
+
+    # A new process over the same outbox delivers what the failed one kept
+    log = DeploymentEventLog("WebsiteDeployments", "us-east-1", outbox_path=str(tmp_path / "outbox.db"), table=table)
+    assert log.flush() == 3
+    assert log.pending() == 0
+    items = {item["deployment_id"]: item for item in table.scan()["Items"]}
+    assert sorted(items) == sorted(ids)
+    assert items[ids[0]]["message"] == "deploy 0" and items[ids[0]]["site_id"] == "s1"
+
+def test_flush_sends_in_batches(table, tmp_path, monkeypatch):
+    monkeypatch.setattr("event_log.FLUSH_BATCH_SIZE", 2)
+    log = DeploymentEventLog("WebsiteDeployments", "us-east-1", outbox_path=str(tmp_path / "outbox.db"), table=table)
+    for i in range(5):
+        log.record("SUCCESS", f"deploy {i}")
+
+    assert log.flush() == 5
+    assert table.scan()["Count"] == 5
@@ -0,0 +1,18 @@
+import asyncio
+
+from jobs import JobQueue, get_job
+
+def test_concurrent_enqueues_coalesce_into_one_job(tmp_db):
+    async def main():
+        queue = JobQueue({"deploy": lambda site_id: {}})
+        queue._queue = asyncio.Queue()  # not started: nothing consumes the jobs
+        ids = await asyncio.gather(*(queue.enqueue("deploy", "s1") for _ in range(5)))
+        other = await queue.enqueue("deploy", "s2")
+        return ids, other, queue._queue.qsize()
+
+    ids, other, queued = asyncio.run(main())
+
+    assert len(set(ids)) == 1
+    assert other != ids[0]
+    assert queued == 2
+    assert get_job(ids[0])["status"] == "queued"
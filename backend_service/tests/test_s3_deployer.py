@@ -0,0 +1,100 @@
+import gzip
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import s3_deployer
+from s3_deployer import deploy_site, invalidation_paths
+
+BUCKET = "site-bucket"
+
+class RecordingCloudFront:
+    def __init__(self):
+        self.paths = []
+
+    def create_invalidation(self, DistributionId, InvalidationBatch):
+        self.paths.append(InvalidationBatch["Paths"]["Items"])
+        return {"Invalidation": {"Id": f"I{len(self.paths)}"}}
+
+@pytest.fixture
+def s3(monkeypatch):
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(name, "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+def _site(site_dir, files):
+    for name, body in files.items():
+        path = site_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+def _keys(s3, prefix=""):
+    return sorted(o["Key"] for o in s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix).get("Contents", []))
+
+def test_deploys_only_changes_and_deletes_removed_keys(s3, tmp_path):
+    site, manifest, cloudfront = tmp_path / "site", tmp_path / "manifest.json", RecordingCloudFront()
+    _site(site, {"index.html": b"<h1>v1</h1>", "about.html": b"about", "contact.html": b"contact",
+                 "assets/styles.abc123.css": b"body{}"})
+
+    first = deploy_site(site, BUCKET, "DIST", manifest, prefix="sites/s1/", s3=s3, cloudfront=cloudfront)
+    assert sorted(first["uploaded"]) == ["about.html", "assets/styles.abc123.css", "contact.html", "index.html"]
+
+    again = deploy_site(site, BUCKET, "DIST", manifest, prefix="sites/s1/", s3=s3, cloudfront=cloudfront)
+    assert again["uploaded"] == [] and again["deleted"] == [] and again["invalidation_id"] is None
+
+    (site / "about.html").write_bytes(b"about v2")
+    (site / "contact.html").unlink()
+    (site / "assets/styles.abc123.css").unlink()
+    (site / "assets/styles.def456.css").write_bytes(b"body{color:red}")
+    result = deploy_site(site, BUCKET, "DIST", manifest, prefix="sites/s1/", s3=s3, cloudfront=cloudfront)
+
+    assert sorted(result["uploaded"]) == ["about.html", "assets/styles.def456.css"]
+    assert result["deleted"] == ["contact.html"]
+    # Old hashed assets stay for pages still cached at the edge
+    assert _keys(s3) == ["sites/s1/about.html", "sites/s1/assets/styles.abc123.css",
+                         "sites/s1/assets/styles.def456.css", "sites/s1/index.html"]
+    # Hashed assets are never invalidated, only the touched pages
+    assert cloudfront.paths[-1] == ["/sites/s1/about.html", "/sites/s1/contact.html"]
+
+def test_precompressed_bodies_and_cache_headers(s3, tmp_path):
+    site = tmp_path / "site"
+    _site(site, {"index.html": b"<h1>hi</h1>", "index.html.gz": gzip.compress(b"<h1>hi</h1>"),
+                 "assets/styles.abc123.css": b"body{}", "images/logo.png": b"png"})
+
+    deploy_site(site, BUCKET, None, tmp_path / "manifest.json", s3=s3)
+
+    assert _keys(s3) == ["assets/styles.abc123.css", "images/logo.png", "index.html"]
+    page = s3.head_object(Bucket=BUCKET, Key="index.html")
+    assert page["ContentEncoding"] == "gzip"
+    assert page["ContentType"] == "text/html; charset=utf-8"
+    assert page["CacheControl"] == s3_deployer.HTML_CACHE_CONTROL
+    assert s3.head_object(Bucket=BUCKET, Key="assets/styles.abc123.css")["CacheControl"] == s3_deployer.IMMUTABLE_CACHE_CONTROL
+    image = s3.head_object(Bucket=BUCKET, Key="images/logo.png")
+    assert image["CacheControl"] == s3_deployer.ASSET_CACHE_CONTROL and "ContentEncoding" not in image
+
+def test_bucket_root_deploy_never_touches_excluded_sites(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="sites/other/index.html", Body=b"other site")
+    s3.put_object(Bucket=BUCKET, Key="old.html", Body=b"stale")
+    site = tmp_path / "site"
+    _site(site, {"index.html": b"root"})
+
+    # No manifest yet: seeded from the bucket listing
+    result = deploy_site(site, BUCKET, None, tmp_path / "manifest.json", s3=s3, exclude=("sites/",))
+    assert result["deleted"] == ["old.html"]
+
+    # Even a manifest that lists another site's keys must not delete them
+    (tmp_path / "manifest.json").write_text('{"index.html": "x", "sites/other/index.html": "y"}')
+    result = deploy_site(site, BUCKET, None, tmp_path / "manifest.json", s3=s3, exclude=("sites/",))
+    assert result["deleted"] == []
+    assert _keys(s3) == ["index.html", "sites/other/index.html"]
+
+def test_invalidation_paths(monkeypatch):
+    assert invalidation_paths(["index.html", "blog/index.html", "about.html"], "sites/s1/") == [
+        "/sites/s1/", "/sites/s1/about.html", "/sites/s1/blog/", "/sites/s1/blog/index.html", "/sites/s1/index.html"]
+
+    monkeypatch.setattr(s3_deployer, "MAX_INVALIDATION_PATHS", 3)
+    assert invalidation_paths(["a.html", "b.html", "c.html", "d.html"], "sites/s1/") == ["/sites/s1/*"]
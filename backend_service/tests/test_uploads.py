@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from uploads import MalformedUpload, save_multipart
+
+class FakeRequest:
+    def __init__(self, body: bytes, boundary: str = "XyZ"):
+        self.headers = {"content-type": f"multipart/form-data; boundary={boundary}"}
+        self._body = body
+
+    async def stream(self):
+        for i in range(0, len(self._body), 7):
+            yield self._body[i:i + 7]
+
+def _body(*parts):
+    return b"".join(b"--XyZ\r\n" + p + b"\r\n" for p in parts) + b"--XyZ--\r\n"
+
+def test_streams_fields_and_files_to_disk(tmp_path):
+    body = _body(b'Content-Disposition: form-data; name="site_id"\r\n\r\nabc',
+                 b'Content-Disposition: form-data; name="voice"; filename="v.mp3"\r\n\r\nMP3DATA')
+
+    fields, files = asyncio.run(save_multipart(FakeRequest(body), tmp_path))
+
+    assert fields == {"site_id": "abc"}
+    assert files[0]["filename"] == "v.mp3" and files[0]["bytes"] == 7
+    assert open(files[0]["path"], "rb").read() == b"MP3DATA"
+
+def test_malformed_body_is_a_client_error(tmp_path):
+    # First part is fine (its file is staged), the second has a broken header line
+    body = (b'--XyZ\r\nContent-Disposition: form-data; name="voice"; filename="v.mp3"\r\n\r\nMP3\r\n'
+            b'--XyZ\r\nno colon here\r\n\r\ndata\r\n--XyZ--\r\n')
+
+    with pytest.raises(MalformedUpload):
+        asyncio.run(save_multipart(FakeRequest(body), tmp_path))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,145 @@
+import os
+import uuid
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import multipart
+from multipart.exceptions import ParseError
+from multipart.multipart import parse_options_header
+
+# ---------- CONFIG ----------
+# Per request, summed over all files
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 200 * 1024 * 1024))
+
+class UploadTooLarge(Exception):
+    pass
+
+class MalformedUpload(Exception):
+    pass
+
+# ---------- STREAMING MULTIPART ----------
+class _DiskMultipartParser:
+    """
+    Feeds request.stream() chunks through python-multipart and appends file parts
+    straight to staging files, so memory stays at one network chunk per upload.
+    Parser callbacks only queue work; file I/O runs in a thread once per chunk.
+    """
+
+    def __init__(self, staging_dir: Path, max_bytes: int):
+        self.staging_dir = staging_dir
+        self.max_bytes = max_bytes
+        self.fields: Dict[str, str] = {}
+        self.files: List[Dict[str, object]] = []
+        self.total = 0
+        self._ops: List[Tuple[str, object]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._part = None
+
+    # -- python-multipart callbacks --
+    def on_part_begin(self):
+        self._part = {"name": "", "data": b"", "file": None}
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MalformedUpload('Content-Disposition is missing "name"')
+        self._part["name"] = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            entry = {
+                "field": self._part["name"],
+                "filename": options[b"filename"].decode("utf-8", "replace"),
+                "path": self.staging_dir / f".{uuid.uuid4().hex}.part",
+                "bytes": 0,
+            }
+            self.files.append(entry)
+            self._part["file"] = entry
+            self._ops.append(("open", entry))
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        size = end - start
+        self.total += size
+        if self.total > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        if self._part["file"] is None:
+            self._part["data"] += data[start:end]
+        else:
+            self._part["file"]["bytes"] += size
+            self._ops.append(("write", data[start:end]))
+
+    def on_part_end(self):
+        if self._part["file"] is None:
+            self.fields[self._part["name"]] = self._part["data"].decode("utf-8", "replace")
+        else:
+            self._ops.append(("close", None))
+
+    # -- disk side (worker thread) --
+    def _apply(self, ops, state):
+        for op, arg in ops:
+            if op == "open":
+                state["fh"] = open(arg["path"], "wb")
+            elif op == "write":
+                state["fh"].write(arg)
+            elif state.get("fh"):
+                state["fh"].close()
+                state["fh"] = None
+
+    async def parse(self, content_type: str, stream):
+        _, params = parse_options_header(content_type)
+        if b"boundary" not in params:
+            raise MalformedUpload("Missing multipart boundary")
+        parser = multipart.MultipartParser(params[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        })
+        state = {"fh": None}
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+                if self._ops:
+                    ops, self._ops = self._ops, []
+                    await asyncio.to_thread(self._apply, ops, state)
+            parser.finalize()
+        except BaseException as e:
+            if state["fh"]:
+                state["fh"].close()
+            discard(self.files)
+            # A broken body is the client's fault (400), not a server error
+            if isinstance(e, ParseError):
+                raise MalformedUpload(f"Malformed multipart body: {e}") from e
+            raise
+
+def discard(files: List[Dict[str, object]]):
+    """Removes staged files that were not moved into a workspace."""
+    for entry in files:
+        Path(entry["path"]).unlink(missing_ok=True)
+
+async def save_multipart(request, staging_dir: Path, max_bytes: int = MAX_UPLOAD_BYTES):
+    """
+    Streams a multipart/form-data request to disk.
+    Returns (fields, files) with files as [{"field", "filename", "path", "bytes"}];
+    the caller moves or discard()s the staged paths.
+    """
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    parser = _DiskMultipartParser(staging_dir, max_bytes)
+    await parser.parse(request.headers.get("content-type", ""), request.stream())
+    return parser.fields, parser.files
@@ -0,0 +1,110 @@
+import os
+import re
+import time
+import uuid
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+# ---------- CONFIG ----------
+BASE_DIR = Path(__file__).resolve().parent
+WORKSPACES_DIR = BASE_DIR / "sites"
+# Untouched workspaces older than this are garbage collected
+WORKSPACE_TTL_SECONDS = float(os.environ.get("WORKSPACE_TTL_SECONDS", 7 * 24 * 3600))
+
+# The legacy single-site layout: static_site/ synced to the bucket root
+DEFAULT_SITE_ID = "default"
+# Every other site lives under this bucket prefix
+SITES_S3_PREFIX = "sites/"
+_SITE_ID_RE = re.compile(r"^[a-z0-9][a-z0-9-]{0,63}$")
+
+# ---------- WORKSPACE ----------
+class Workspace:
+    """Directories, S3 prefix and deploy manifest of one generated site."""
+
+    def __init__(self, site_id: str):
+        self.site_id = site_id
+        if site_id == DEFAULT_SITE_ID:
+            self.root = BASE_DIR
+            self.site_dir = BASE_DIR / "static_site"
+            self.s3_prefix = ""
+            # Shares the bucket root with sites/<id>/; its deploys must never touch them
+            self.s3_exclude = (SITES_S3_PREFIX,)
+            self.manifest_path = BASE_DIR / "data" / "deploy_manifest.json"
+            # Minified/precompressed build of site_dir; this is what gets deployed
+            self.dist_dir = BASE_DIR / "data" / "dist"
+            self.img_src_dir = BASE_DIR / "data" / "sources" / "images"
+            self.audio_src_dir = BASE_DIR / "data" / "sources" / "audio"
+        else:
+            self.root = WORKSPACES_DIR / site_id
+            self.site_dir = self.root / "site"
+            self.s3_prefix = f"{SITES_S3_PREFIX}{site_id}/"
+            self.s3_exclude = ()
+            self.manifest_path = self.root / "deploy_manifest.json"
+            self.dist_dir = self.root / "dist"
+            # Original downloads/uploads; only their transcoded variants are published
+            self.img_src_dir = self.root / "sources" / "images"
+            self.audio_src_dir = self.root / "sources" / "audio"
+        self.img_dir = self.site_dir / "assets" / "images"
+        self.audio_dir = self.site_dir / "assets" / "audio"
+
+    def exists(self) -> bool:
+        return self.site_dir.is_dir()
+
+    def touch(self):
+        """Marks the workspace as in use (resets its GC clock)."""
+        self.site_dir.mkdir(parents=True, exist_ok=True)
+        (self.site_dir / ".last_used").touch()
+
+    def last_used(self) -> float:
+        marker = self.site_dir / ".last_used"
+        return marker.stat().st_mtime if marker.exists() else self.site_dir.stat().st_mtime
+
+class UnsafePath(ValueError):
+    pass
+
+def safe_join(base: Path, name: str) -> Path:
+    """base / name for a client-supplied name; refuses anything that resolves outside base."""
+    if not isinstance(name, str) or not name or "\x00" in name:
+        raise UnsafePath(f"Invalid file name {name!r}")
+    root = base.resolve()
+    path = (base / name).resolve()
+    if root not in path.parents:
+        raise UnsafePath(f"File name escapes the site directory: {name!r}")
+    return base / path.relative_to(root)
+
+def valid_site_id(site_id: str) -> bool:
+    return bool(site_id) and bool(_SITE_ID_RE.match(site_id))
+
+def create_workspace(site_id: str = None) -> Workspace:
+    ws = Workspace(site_id or uuid.uuid4().hex[:12])
+    ws.img_dir.mkdir(parents=True, exist_ok=True)
+    ws.img_src_dir.mkdir(parents=True, exist_ok=True)
+    ws.audio_dir.mkdir(parents=True, exist_ok=True)
+    ws.audio_src_dir.mkdir(parents=True, exist_ok=True)
+    ws.touch()
+    print(f"🗂️ Workspace ready → {ws.site_id}")
+    return ws
+
+def get_workspace(site_id: str = None) -> Optional[Workspace]:
+    site_id = site_id or DEFAULT_SITE_ID
+    if not valid_site_id(site_id):
+        return None
+    ws = Workspace(site_id)
+    return ws if ws.exists() or site_id == DEFAULT_SITE_ID else None
+
+def gc_workspaces(max_age: float = WORKSPACE_TTL_SECONDS, keep: Iterable[str] = ()) -> List[str]:
+    """Deletes workspaces unused for max_age seconds, except the default site and `keep`."""
+    if not WORKSPACES_DIR.exists():
+        return []
+    keep, removed, cutoff = set(keep), [], time.time() - max_age
+    for root in WORKSPACES_DIR.iterdir():
+        if not root.is_dir() or root.name in keep or not valid_site_id(root.name):
+            continue
+        ws = Workspace(root.name)
+        if not ws.exists() or ws.last_used() < cutoff:
+            shutil.rmtree(root, ignore_errors=True)
+            removed.append(root.name)
+    if removed:
+        print(f"🧹 Removed {len(removed)} abandoned workspace(s): {', '.join(removed)}")
+    return removed
@@ -0,0 +1,89 @@
+"""
+Throughput benchmark for backend_service/db.py under concurrent writers.
+
+Compares the pooled WAL layer (bulk executemany + pooled reads) with the
+previous pattern of one fresh sqlite3 connection and commit per operation.
+
+    python benchmarks/bench_db.py --writers 8 --readers 8 --rows 2000
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend_service"))
+
+import db  # noqa: E402
+
+def _rows(writer: int, n: int):
+    return [{"site_id": f"w{writer}", "path": f"assets/images/{i}.png", "kind": "images", "sha256": f"{writer:04d}{i:060d}",
+             "bytes": i, "source_url": None, "updated_at": 0.0} for i in range(n)]
+
+def _run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+def bench_pooled(args):
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "pooled.db")
+    db.get_pool()
+    batch = 100
+
+    def writer(w):
+        rows = _rows(w, args.rows)
+        for i in range(0, len(rows), batch):
+            db.bulk_insert("assets", rows[i:i + batch], replace=True)
+
+    def reader(r):
+        for i in range(args.reads):
+            db.execute("SELECT path, bytes FROM assets WHERE site_id = ? AND path = ?;", (f"w{r % args.writers}", f"assets/images/{i % args.rows}.png"))
+
+    return _run_threads(writer, args.writers), _run_threads(reader, args.readers)
+
+def bench_legacy(args):
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE assets (site_id TEXT, path TEXT, kind TEXT, sha256 TEXT, bytes INTEGER, source_url TEXT, updated_at REAL, PRIMARY KEY (site_id, path));")
+    conn.commit()
+    conn.close()
+    lock = threading.Lock()  # rollback-journal writers would otherwise fail with "database is locked"
+
+    def writer(w):
+        for row in _rows(w, args.rows):
+            with lock:
+                c = sqlite3.connect(path)
+                c.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?);", tuple(row.values()))
+                c.commit()
+                c.close()
+
+    def reader(r):
+        for i in range(args.reads):
+            c = sqlite3.connect(path, timeout=30)
+            c.execute("SELECT path, bytes FROM assets WHERE site_id = ? AND path = ?;", (f"w{r % args.writers}", f"assets/images/{i % args.rows}.png")).fetchall()
+            c.close()
+
+    return _run_threads(writer, args.writers), _run_threads(reader, args.readers)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=2000, help="rows inserted per writer")
+    parser.add_argument("--reads", type=int, default=2000, help="point lookups per reader")
+    args = parser.parse_args()
+
+    inserts, reads = args.writers * args.rows, args.readers * args.reads
+    for name, fn in (("legacy (connection per op)", bench_legacy), ("pooled WAL + executemany", bench_pooled)):
+        w, r = fn(args)
+        print(f"{name:28s} inserts/sec {inserts / w:12,.0f}   reads/sec {reads / r:12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+End-to-end load benchmark for both services, fully offline.
+
+The agent stage replaces the Gemini client with a stub whose latency/jitter and
+response size are configurable, then drives POST /generate-website. The backend
+stage runs moto (S3, CloudFront, DynamoDB) and a local HTTP stand-in for the
+media URLs and the friend-agent callback, then drives POST /bootstrap and
+POST /submit-assets and waits for the queued deploys. Both apps are called
+in-process through httpx's ASGI transport.
+
+Each stage runs in its own subprocess, so peak RSS is per stage. Reported per
+stage: throughput, p50/p95/p99 latency and peak RSS.
+
+    python benchmarks/bench_e2e.py --requests 200 --concurrency 16 --latency-ms 800 --jitter-ms 300
+    python benchmarks/bench_e2e.py --save-baseline benchmarks/baselines/e2e.json
+    python benchmarks/bench_e2e.py --compare benchmarks/baselines/e2e.json --tolerance 0.15
+
+--compare exits 1 when p95 grows, or throughput drops, by more than the tolerance.
+"""
+import io
+import os
+import sys
+import json
+import time
+import types
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = Path(__file__).resolve().parents[1]
+SECTIONS = ["About Us", "Our Services", "Meet the Team", "Contact"]
+TYPES = ["hospital", "gym", "spa", "school", "restaurant", "tech"]
+
+# ---------- MEASUREMENT ----------
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+class RssSampler:
+    """Tracks the peak resident set size of this process while a stage runs."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+def summarize(latencies, errors, elapsed, peak_rss):
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+    }
+
+async def drive(n, concurrency, call):
+    """Runs call(i) for i < n with bounded concurrency; returns (latencies, errors, elapsed)."""
+    slots = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def _one(i):
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await call(i)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors += 1
+                print(f"request {i} failed: {e!r}", file=sys.stderr)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(i) for i in range(n)))
+    return latencies, errors, time.perf_counter() - start
+
+# ---------- MOCKED MODEL ----------
+def install_fake_gemini(latency_ms: float, jitter_ms: float, words: int, seed: int):
+    """Registers a google.generativeai stand-in before the agent modules import it."""
+    rng = random.Random(seed)
+    filler = " ".join(["lorem", "ipsum", "dolor", "sit", "amet", "consectetur"] * (words // 6 + 1))
+
+    def _delay():
+        return max(0.0, rng.gauss(latency_ms, jitter_ms / 2)) / 1000 if jitter_ms else latency_ms / 1000
+
+    def _paragraphs():
+        per = max(1, words // 5)
+        return "\n\n".join(" ".join(filler.split()[:per]) for _ in range(5))
+
+    def _respond(prompt: str) -> str:
+        if "numbered input" in prompt:
+            n = sum("| website_type:" in line for line in prompt.splitlines())
+            return json.dumps({"results": [{"index": i, "business_name": f"Business {i}", "website_type": "Refined Services", "sections": SECTIONS} for i in range(1, n + 1)]})
+        if "planning assistant" in prompt:
+            name = prompt.split("business_name:", 1)[1].splitlines()[0].strip()
+            return json.dumps({"business_name": name.title(), "website_type": "Refined Services", "sections": SECTIONS})
+        if "section to write:" in prompt:
+            title = prompt.split("section to write:", 1)[1].splitlines()[0].strip()
+            return json.dumps({"title": title, "content": _paragraphs()})
+        return "```json\n" + json.dumps({"sections": [{"title": s, "content": _paragraphs()} for s in SECTIONS]}) + "\n```"
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    class StreamedResponse:
+        """stream=True: the text in a few chunks, with the latency spread across them."""
+        chunks = 8
+
+        def __init__(self, text, delay):
+            size = len(text) // self.chunks + 1
+            self._parts = [Response(text[i:i + size]) for i in range(0, len(text), size)]
+            self._step = delay / self.chunks
+
+        def __iter__(self):
+            for part in self._parts:
+                time.sleep(self._step)
+                yield part
+
+        async def __aiter__(self):
+            for part in self._parts:
+                await asyncio.sleep(self._step)
+                yield part
+
+    class GenerativeModel:
+        def __init__(self, model_name, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, stream=False, **kwargs):
+            if stream:
+                return StreamedResponse(_respond(prompt), _delay())
+            time.sleep(_delay())
+            return Response(_respond(prompt))
+
+        async def generate_content_async(self, prompt, stream=False, **kwargs):
+            if stream:
+                return StreamedResponse(_respond(prompt), _delay())
+            await asyncio.sleep(_delay())
+            return Response(_respond(prompt))
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = GenerativeModel
+    google = sys.modules.get("google") or types.ModuleType("google")
+    google.generativeai = genai
+    sys.modules["google"] = google
+    sys.modules["google.generativeai"] = genai
+
+# ---------- STAGES ----------
+async def run_agent(args):
+    install_fake_gemini(args.latency_ms, args.jitter_ms, args.words, args.seed)
+    os.environ["AGENT_CACHE_PATH"] = ""  # in-memory only: every run starts cold
+    os.environ.setdefault("GEMINI_API_KEY", "bench")  # the stand-in model ignores it
+    sys.path.insert(0, str(ROOT / "agent_api"))
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent", timeout=None) as client:
+        async def _generate(i):
+            r = await client.post("/generate-website", json={
+                "business_name": f"bench business {args.seed}-{i}", "website_type": TYPES[i % len(TYPES)],
+                "sections_required": SECTIONS, "per_section": args.per_section,
+            })
+            r.raise_for_status()
+
+        with RssSampler() as rss:
+            latencies, errors, elapsed = await drive(args.requests, args.concurrency, _generate)
+    return {"generate-website": summarize(latencies, errors, elapsed, rss.peak)}
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Serves the media agent's asset URLs and accepts the friend-agent callback."""
+    files = {}
+
+    def do_GET(self):
+        body = self.files.get(self.path.split("?")[0])
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        self.wfile.write(body or b"")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def _page(i: int, filename: str, image_ids, kb: int) -> str:
+    text = ("<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16 + "</p>\n") * max(1, kb)
+    markers = "\n".join(f"<!-- IMAGE_PLACEHOLDER:{img} -->" for img in image_ids)
+    return f"<!doctype html><html><head><title>Site {i} {filename}</title></head><body>{markers}\n{text}<!-- VOICE_PLACEHOLDER --></body></html>"
+
+async def run_backend(args):
+    work = Path(tempfile.mkdtemp(prefix="bench_e2e_"))
+    os.environ.update(AWS_ACCESS_KEY_ID="bench", AWS_SECRET_ACCESS_KEY="bench", AWS_DEFAULT_REGION="us-east-1")
+    from moto import mock_aws
+    mock = mock_aws()
+    mock.start()
+
+    # Local stand-in for the media URLs and the friend-agent webhook
+    from PIL import Image, ImageFilter
+    size = (args.image_width, args.image_width * 9 // 16)
+    # Smooth gradients plus blurred grain: encodes like a photo, unlike pure noise
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 48).filter(ImageFilter.GaussianBlur(3))
+    png = io.BytesIO()
+    Image.merge("RGB", (gradient, grain, gradient.transpose(Image.FLIP_LEFT_RIGHT))).save(png, "PNG")
+    _StandIn.files = {"/hero.png": png.getvalue(), "/intro.mp3": b"ID3" + os.urandom(args.audio_kb * 1024)}
+    stand_in = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{stand_in.server_port}"
+
+    sys.path.insert(0, str(ROOT / "backend_service"))
+    import db
+    db.DB_PATH = str(work / "site.db")
+    import workspaces
+    workspaces.WORKSPACES_DIR = work / "sites"
+    import event_log
+    import deploy
+    import server
+    import boto3
+    import httpx
+
+    server.UPLOAD_STAGING_DIR = work / "uploads"
+    deploy.FRIEND_CALLBACK_URL = f"{base_url}/callback"
+    boto3.client("s3", region_name=deploy.AWS_REGION).create_bucket(Bucket=deploy.S3_BUCKET)
+    boto3.client("dynamodb", region_name=deploy.AWS_REGION).create_table(
+        TableName=deploy.DYNAMO_TABLE, BillingMode="PAY_PER_REQUEST",
+        KeySchema=[{"AttributeName": "deployment_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "deployment_id", "AttributeType": "S"}],
+    )
+    distribution = boto3.client("cloudfront", region_name=deploy.AWS_REGION).create_distribution(DistributionConfig={
+        "CallerReference": "bench", "Comment": "bench", "Enabled": True,
+        "Origins": {"Quantity": 1, "Items": [{"Id": "s3", "DomainName": f"{deploy.S3_BUCKET}.s3.amazonaws.com", "S3OriginConfig": {"OriginAccessIdentity": ""}}]},
+        "DefaultCacheBehavior": {"TargetOriginId": "s3", "ViewerProtocolPolicy": "allow-all", "MinTTL": 0,
+                                 "ForwardedValues": {"QueryString": False, "Cookies": {"Forward": "none"}}, "TrustedSigners": {"Enabled": False, "Quantity": 0}},
+    })
+    deploy.CLOUDFRONT_ID = distribution["Distribution"]["Id"]
+    # Keep the DynamoDB outbox out of the service's data directory
+    log = event_log.DeploymentEventLog(deploy.DYNAMO_TABLE, deploy.AWS_REGION, outbox_path=str(work / "outbox.db"))
+    log.start()
+    event_log._event_logs[(deploy.DYNAMO_TABLE, deploy.AWS_REGION)] = log
+
+    image_ids = ["home_hero"] + [f"{s.lower().replace(' ', '-')}_img{n}" for s in SECTIONS for n in (1, 2)]
+    site_ids, job_ids = {}, {}
+    results = {}
+    await server.app.router.startup()
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=None) as client:
+            async def _bootstrap(i):
+                pages = [{"filename": "index.html", "html_file": _page(i, "index.html", image_ids[:1], args.page_kb)}]
+                pages += [{"filename": f"{s.lower().replace(' ', '-')}.html", "html_file": _page(i, s, image_ids[1 + 2 * n:3 + 2 * n], args.page_kb)}
+                          for n, s in enumerate(SECTIONS)]
+                r = await client.post("/bootstrap", json={
+                    "pages": pages, "images_needed": [], "voice_scripts_needed": [],
+                    "callback_url_for_assets": "http://backend/submit-assets",
+                })
+                r.raise_for_status()
+                site_ids[i] = r.json()["site_id"]
+
+            async def _submit(i):
+                r = await client.post(f"/submit-assets?site_id={site_ids[i]}", json={
+                    # Distinct query strings: every site downloads its own copy
+                    "images": [{"id": img, "file_url": f"{base_url}/hero.png?site={i}&img={img}"} for img in image_ids],
+                    "voices": [{"id": "site_intro", "file_url": f"{base_url}/intro.mp3?site={i}"}],
+                })
+                r.raise_for_status()
+                job_ids[i] = r.json()["job_id"]
+
+            with RssSampler() as rss:
+                latencies, errors, elapsed = await drive(args.sites, args.concurrency, _bootstrap)
+            results["bootstrap"] = summarize(latencies, errors, elapsed, rss.peak)
+
+            with RssSampler() as rss:
+                latencies, errors, elapsed = await drive(len(site_ids), args.concurrency, lambda n: _submit(sorted(site_ids)[n]))
+            results["submit-assets"] = summarize(latencies, errors, elapsed, rss.peak)
+
+            # Deploys run on the job queue; latency is queue wait + build + S3/CloudFront/DynamoDB
+            with RssSampler() as rss:
+                start = time.perf_counter()
+                pending = set(job_ids.values())
+                while pending:
+                    await asyncio.sleep(0.05)
+                    for job_id in list(pending):
+                        if (await client.get(f"/jobs/{job_id}")).json()["status"] in ("succeeded", "failed"):
+                            pending.discard(job_id)
+                elapsed = time.perf_counter() - start
+            jobs = [(await client.get(f"/jobs/{job_id}")).json() for job_id in set(job_ids.values())]
+            done = [j["finished_at"] - j["created_at"] for j in jobs if j["status"] == "succeeded"]
+            for j in jobs:
+                if j["status"] != "succeeded":
+                    print(f"deploy {j['id']} failed: {j['error']}", file=sys.stderr)
+            results["deploy-job"] = summarize(done, len(jobs) - len(done), elapsed, rss.peak)
+    finally:
+        await server.app.router.shutdown()
+        log.stop()
+        stand_in.shutdown()
+        mock.stop()
+    return results
+
+STAGES = {"agent": run_agent, "backend": run_backend}
+
+# ---------- REPORT / BASELINES ----------
+def print_report(results):
+    print(f"{'stage':<18}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak RSS MB':>13}")
+    for stage, r in results.items():
+        print(f"{stage:<18}{r['requests']:>9}{r['errors']:>8}{r['throughput_rps'] or 0:>10.2f}{r['p50_ms'] or 0:>10.1f}"
+              f"{r['p95_ms'] or 0:>10.1f}{r['p99_ms'] or 0:>10.1f}{r['peak_rss_mb']:>13.1f}")
+
+def compare(results, baseline, tolerance):
+    """Prints the change against a saved baseline; returns the regressed stages."""
+    regressions = []
+    print(f"\ncompared with baseline ({baseline['meta'].get('saved_at', '?')}), tolerance {tolerance:.0%}:")
+    for stage, r in results.items():
+        base = baseline["stages"].get(stage)
+        if not base or not r["p95_ms"] or not base.get("p95_ms"):
+            continue
+        p95 = r["p95_ms"] / base["p95_ms"] - 1
+        rps = r["throughput_rps"] / base["throughput_rps"] - 1
+        regressed = p95 > tolerance or rps < -tolerance
+        regressions += [stage] if regressed else []
+        print(f"  {stage:<18} p95 {p95:+7.1%}   throughput {rps:+7.1%}   {'REGRESSION' if regressed else 'ok'}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stages", default="agent,backend", help="comma-separated: agent, backend")
+    parser.add_argument("--requests", type=int, default=100, help="/generate-website calls")
+    parser.add_argument("--sites", type=int, default=50, help="sites bootstrapped, filled and deployed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-section", action="store_true", help="one model call per section")
+    parser.add_argument("--latency-ms", type=float, default=800, help="mean stubbed model latency")
+    parser.add_argument("--jitter-ms", type=float, default=300, help="spread of the stubbed latency")
+    parser.add_argument("--words", type=int, default=400, help="words per generated section")
+    parser.add_argument("--page-kb", type=int, default=8, help="approximate size of each bootstrapped page")
+    parser.add_argument("--image-width", type=int, default=1600, help="width of the served source PNG")
+    parser.add_argument("--audio-kb", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--verbose", action="store_true", help="keep the services' own output")
+    parser.add_argument("--child", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        if not args.verbose:
+            sys.stdout = open(os.devnull, "w")
+        results = asyncio.run(STAGES[args.child](args))
+        args.out.write_text(json.dumps(results))
+        return 0
+
+    results = {}
+    child_args = []
+    for name, value in vars(args).items():
+        if name in ("stages", "save_baseline", "compare", "tolerance", "child", "out") or value in (None, False):
+            continue
+        child_args += [f"--{name.replace('_', '-')}"] + ([] if value is True else [str(value)])
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    for stage in [s.strip() for s in args.stages.split(",") if s.strip()]:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+            out_path = Path(out.name)
+        subprocess.run([sys.executable, __file__, *child_args, "--child", stage, "--out", str(out_path)], env=env, check=True)
+        results.update(json.loads(out_path.read_text()))
+        out_path.unlink()
+
+    print_report(results)
+    meta = {k: v for k, v in vars(args).items() if k not in ("save_baseline", "compare", "child", "out", "verbose")}
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps({"meta": {**meta, "saved_at": time.strftime("%Y-%m-%d %H:%M:%S")}, "stages": results}, indent=2))
+        print(f"\nbaseline saved → {args.save_baseline}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline["meta"].get("concurrency") != args.concurrency:
+            print("note: baseline was recorded with a different --concurrency")
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
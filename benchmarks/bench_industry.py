@@ -0,0 +1,146 @@
+"""
+Benchmark for the industry index behind themes, chatbot FAQs and prompt hints.
+
+Resolves a large batch of free-text website types (--distinct of them, repeated
+to --types) three ways and prints the per-lookup cost:
+  * legacy  — the previous substring chains (theme + FAQs, each behind its own
+              lru_cache of 1024 entries, so large batches keep missing)
+  * index   — one uncached trie lookup per type (cold worker)
+  * cached  — lookup_industry, as the request path calls it
+It also counts the types the old chains classified inconsistently (theme from
+one industry, FAQs from another) and compares the content prompt size.
+
+    python benchmarks/bench_industry.py --types 200000 --distinct 5000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from textwrap import dedent
+from functools import lru_cache
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent_api"))
+
+from industries import get_index, lookup_industry  # noqa: E402
+from agent_logic import build_content_prompt  # noqa: E402
+
+NOUNS = ["hospital", "clinic", "dental clinic", "healthcare", "gym", "fitness studio", "yoga", "spa", "school",
+         "training academy", "restaurant", "cafe", "hotel", "hospitality group", "tech", "software", "IT services",
+         "digital agency", "real estate", "law firm", "boutique", "bakery", "consulting", "travel", "pet care",
+         "photography", "wedding planner", "auto repair"]
+MODIFIERS = ["", "local", "family", "premium", "boutique", "24/7", "community", "modern", "luxury", "online", "city"]
+SECTIONS = ["About Us", "Our Services", "Meet the Team", "Contact"]
+
+# ---------- PREVIOUS IMPLEMENTATION (reference) ----------
+def legacy_theme_kind(website_type):
+    wt = website_type.lower()
+    if any(k in wt for k in ["hospital", "health", "clinic", "care"]): return "health"
+    if any(k in wt for k in ["gym", "fitness", "sports"]): return "fitness"
+    if any(k in wt for k in ["spa", "yoga", "wellness"]): return "wellness"
+    if any(k in wt for k in ["school", "education", "training"]): return "education"
+    if any(k in wt for k in ["restaurant", "food", "hotel"]): return "food"
+    if any(k in wt for k in ["tech", "software", "it", "digital"]): return "tech"
+    return "default"
+
+LEGACY_THEMES = {"health": "#4A63FF", "fitness": "#FF6B3D", "wellness": "#6A8CAF", "education": "#8A5AFF",
+                 "food": "#D96F32", "tech": "#0057FF", "default": "#4A63FF"}
+
+def legacy_faq_kind(website_type):
+    wt = website_type.lower()
+    if "hospital" in wt: return "health"
+    elif "restaurant" in wt: return "food"
+    elif "tech" in wt: return "tech"
+    return "default"
+
+@lru_cache(maxsize=1024)
+def legacy_theme(website_type):
+    return LEGACY_THEMES[legacy_theme_kind(website_type)]
+
+@lru_cache(maxsize=1024)
+def legacy_faqs(website_type):
+    kind = legacy_faq_kind(website_type)
+    return {f"{kind} q1?": "a1.", f"{kind} q2?": "a2.", f"{kind} q3?": "a3."}
+
+def legacy_lookup(website_type):
+    # Two separately cached chains, as pick_theme_color/get_chatbot_faqs were
+    return legacy_theme(website_type), legacy_faqs(website_type)
+
+def legacy_inconsistent(website_type):
+    # Theme from one industry, FAQs from another (only 3 industries had their own FAQs)
+    theme, faqs = legacy_theme_kind(website_type), legacy_faq_kind(website_type)
+    return theme != faqs and (faqs != "default" or theme in ("health", "food", "tech"))
+
+def legacy_content_prompt(business_name, website_type, sections):
+    return dedent(f"""
+        You are a professional AI website writer for any industry.
+
+        business_name: {business_name}
+        website_type: {website_type}
+        sections: {sections}
+
+        Write 5–6 paragraphs (350–500 words) per section.
+        Make the tone professional yet friendly and domain-appropriate:
+        - Hospitals → care, compassion, trust
+        - Restaurants → taste, experience, ambiance
+        - Tech → innovation, reliability, quality
+        - Fitness → motivation, transformation, wellness
+        - Education → learning, growth, empowerment
+
+        Each section should be rich, structured, and human-like.
+
+        Return JSON only:
+        {{
+          "sections": [
+            {{ "title": "Section Name", "content": "Detailed text..." }}
+          ]
+        }}
+    """)
+
+def make_types(distinct: int, seed: int):
+    rng = random.Random(seed)
+    types = set()
+    while len(types) < distinct:
+        noun = rng.choice(NOUNS)
+        if rng.random() < 0.3:
+            noun = f"{noun} and {rng.choice(NOUNS)}"
+        types.add(" ".join(filter(None, [rng.choice(MODIFIERS), noun, f"#{rng.randrange(10 ** 6)}"])).title())
+    return sorted(types)
+
+def _time(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--types", type=int, default=200000, help="lookups per strategy")
+    parser.add_argument("--distinct", type=int, default=5000, help="distinct website types in the batch")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    distinct = make_types(args.distinct, args.seed)
+    batch = [distinct[i % len(distinct)] for i in range(args.types)]
+    random.Random(args.seed).shuffle(batch)
+    index = get_index()
+
+    timings = {
+        "legacy": _time(legacy_lookup, batch),
+        "index": _time(index.lookup, batch),
+        "cached": _time(lookup_industry, batch),
+    }
+    print(f"{len(batch)} lookups over {len(distinct)} distinct website types")
+    for name, seconds in timings.items():
+        print(f"{name:<8}{seconds / len(batch) * 1e6:>8.2f} µs/lookup  {len(batch) / seconds:>12,.0f} lookups/s")
+
+    mixed = [t for t in distinct if legacy_inconsistent(t)]
+    print(f"legacy theme/FAQ disagreements: {len(mixed)}/{len(distinct)} (e.g. {mixed[:3]})")
+
+    samples = distinct[:200]
+    old = sum(len(legacy_content_prompt("Acme", t, SECTIONS)) for t in samples) / len(samples)
+    new = sum(len(build_content_prompt("Acme", t, SECTIONS)) for t in samples) / len(samples)
+    print(f"content prompt: {old:.0f} -> {new:.0f} chars (~{old / 4:.0f} -> ~{new / 4:.0f} tokens, {1 - new / old:.0%} smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark for the agent_logic page builders.
+
+Renders N five-page sites with the compiled templates and with the previous
+f-string builders (re-dedenting the CSS on every page), checks both produce
+identical HTML and prints the per-site cost.
+
+    python benchmarks/bench_render.py --sites 2000
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+from textwrap import dedent
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent_api"))
+
+import agent_logic  # noqa: E402
+from agent_logic import slug_hyphen, html_escape, get_chatbot_faqs  # noqa: E402
+
+THEMES = ["#4A63FF", "#FF6B3D", "#6A8CAF", "#8A5AFF", "#D96F32", "#0057FF"]
+TYPES = ["hospital", "gym", "spa", "school", "restaurant", "tech"]
+SECTIONS = ["About Us", "Our Services", "Meet the Team", "Contact"]
+TEXT = "\n\n".join(["Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 12] * 6)
+
+# ---------- PREVIOUS IMPLEMENTATION (reference) ----------
+def legacy_styles(primary):
+    return dedent("\n".join("        " + line for line in agent_logic.build_styles(primary).splitlines())).strip()
+
+def legacy_home(site_name, sections, theme, website_type):
+    faqs = get_chatbot_faqs(website_type)
+    faq_html = "".join([f"<p><b>{q}</b><br>{a}</p>" for q, a in faqs.items()])
+    nav_links = " ".join(f"<a href='{slug_hyphen(s)}.html'>{html_escape(s)}</a>" for s in sections)
+    cards = "\n".join(f"<div class='card'><h3>{html_escape(s)}</h3><p>Explore {html_escape(s)} to learn more.</p><a class='btn' href='{slug_hyphen(s)}.html'>View</a></div>" for s in sections)
+    return f"""<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>{html_escape(site_name)}</title><style>{legacy_styles(theme)}</style></head>
+<body>
+<nav class="navbar"><div class="brand">{html_escape(site_name)}</div><div class="links">{nav_links}</div></nav>
+<section class="hero">
+  <!-- IMAGE_PLACEHOLDER:home_hero -->
+  <div class="hero-content"><h1>Welcome to {html_escape(site_name)}</h1><p>Discover excellence, innovation, and care with us.</p></div>
+</section>
+<section><h2 style="text-align:center;">Explore Our Sections</h2><div class="grid">{cards}</div></section>
+<button id="chatbot">💬</button>
+<div id="chat-window"><h4>Ask Us Anything</h4><div id="chat-content">{faq_html}</div></div>
+<script>const chatBtn=document.getElementById('chatbot');const chatWin=document.getElementById('chat-window');chatBtn.addEventListener('click',()=>{{chatWin.style.display=chatWin.style.display==='none'?'block':'none';}});</script>
+<footer>© {html_escape(site_name)}</footer></body></html>"""
+
+def legacy_section(site_name, section_name, summary_text, theme):
+    sid = slug_hyphen(section_name)
+    parts = [p.strip() for p in summary_text.split("\n\n") if p.strip()]
+    while len(parts) < 5:
+        parts.append(parts[-1])
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>{html_escape(section_name)} — {html_escape(site_name)}</title><style>{legacy_styles(theme)}</style></head>
+<body><nav class="navbar"><a class="btn" href="index.html">← Back</a><div class="brand">{html_escape(section_name)}</div></nav>
+<section class="section-body">
+<p>{html_escape(parts[0])}</p><!-- IMAGE_PLACEHOLDER:{sid}_img1 -->
+<p>{html_escape(parts[1])}</p><!-- IMAGE_PLACEHOLDER:{sid}_img2 -->
+<p>{html_escape(parts[2])}</p><p>{html_escape(parts[3])}</p><p>{html_escape(parts[4])}</p>
+</section><footer>© {html_escape(site_name)}</footer></body></html>"""
+
+# ---------- HARNESS ----------
+def render_site(home, section, i):
+    theme, website_type = THEMES[i % len(THEMES)], TYPES[i % len(TYPES)]
+    name = f"Business {i}"
+    pages = [home(name, SECTIONS, theme, website_type)]
+    pages.extend(section(name, sec, TEXT, theme) for sec in SECTIONS)
+    return pages
+
+def timed(home, section, sites):
+    start = time.perf_counter()
+    for i in range(sites):
+        render_site(home, section, i)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=2000)
+    args = parser.parse_args()
+
+    for i in range(len(THEMES)):
+        assert render_site(legacy_home, legacy_section, i) == render_site(agent_logic.build_home_html, agent_logic.build_section_html, i), "output mismatch"
+
+    legacy = timed(legacy_home, legacy_section, args.sites)
+    compiled = timed(agent_logic.build_home_html, agent_logic.build_section_html, args.sites)
+    print(f"sites rendered     : {args.sites} (5 pages each)")
+    print(f"legacy f-strings   : {legacy / args.sites * 1e6:8.1f} µs/site")
+    print(f"compiled templates : {compiled / args.sites * 1e6:8.1f} µs/site")
+    print(f"speedup            : {legacy / compiled:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Startup benchmark for both services: how soon a fresh process can serve traffic.
+
+For each service it measures, over several cold runs:
+  * import — importing the app module (main / server) in a fresh interpreter
+  * health — launching uvicorn until GET /health first answers 200 (liveness)
+  * ready  — launching uvicorn until GET /ready first answers 200 (model/AWS
+             clients warm, job queue up)
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --services agent --workers 4
+
+With --workers > 1 the probes hit whichever worker accepts first, as a load
+balancer would. No model or AWS calls are made; the backend writes its job
+database under backend_service/data/ as it does in production.
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SERVICES = {"agent": ("agent_api", "main"), "backend": ("backend_service", "server")}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+def time_import(service: str) -> float:
+    directory, module = SERVICES[service]
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT / directory, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_ready(service: str, workers: int, timeout: float):
+    """Seconds from spawning uvicorn until /health and then /ready return 200."""
+    directory, module = SERVICES[service]
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT / directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        # Any key will do: the client is configured but never called
+        env={"GEMINI_API_KEY": "bench", **os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    start = time.perf_counter()
+    health = ready = None
+    try:
+        while ready is None and time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{service} exited with {proc.returncode} during startup")
+            if health is None and _status(base + "/health") == 200:
+                health = time.perf_counter() - start
+            if health is not None and _status(base + "/ready") == 200:
+                ready = time.perf_counter() - start
+            else:
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return health, ready
+
+def _fmt(samples):
+    samples = [s for s in samples if s is not None]
+    if not samples:
+        return f"{'timeout':>26}"
+    return f"{statistics.median(samples) * 1000:>10.0f} ms (min {min(samples) * 1000:>6.0f})"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", default="agent,backend", help="comma-separated: agent, backend")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn --workers")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for /ready per run")
+    args = parser.parse_args()
+
+    print(f"{'service':<10}{'phase':<8}{'median':>26}   ({args.runs} cold runs, {args.workers} worker(s))")
+    for service in [s.strip() for s in args.services.split(",") if s.strip()]:
+        imports = [time_import(service) for _ in range(args.runs)]
+        probes = [time_ready(service, args.workers, args.timeout) for _ in range(args.runs)]
+        print(f"{service:<10}{'import':<8}{_fmt(imports)}")
+        print(f"{service:<10}{'health':<8}{_fmt([h for h, _ in probes])}")
+        print(f"{service:<10}{'ready':<8}{_fmt([r for _, r in probes])}")
+
+if __name__ == "__main__":
+    main()